@@ -16,7 +16,7 @@ class Ui_MainWindow(object):
         MainWindow.setStyleSheet("QMainWindow {\n"
 "    background-color: #f5f5f5;\n"
 "}\n"
-"QTableWidget {\n"
+"QTableView {\n"
 "    background-color: white;\n"
 "    border: 1px solid #ddd;\n"
 "    border-radius: 5px;\n"
@@ -67,16 +67,84 @@ class Ui_MainWindow(object):
         spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Minimum)
         self.horizontalLayout.addItem(spacerItem)
         self.verticalLayout.addLayout(self.horizontalLayout)
-        self.tableWidget = QtWidgets.QTableWidget(parent=self.centralwidget)
-        self.tableWidget.setAlternatingRowColors(True)
-        self.tableWidget.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
-        self.tableWidget.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
-        self.tableWidget.setSortingEnabled(True)
-        self.tableWidget.setObjectName("tableWidget")
-        self.tableWidget.setColumnCount(0)
-        self.tableWidget.setRowCount(0)
-        self.verticalLayout.addWidget(self.tableWidget)
+        self.filterLayout = QtWidgets.QHBoxLayout()
+        self.filterLayout.setObjectName("filterLayout")
+        self.searchEdit = QtWidgets.QLineEdit(parent=self.centralwidget)
+        self.searchEdit.setClearButtonEnabled(True)
+        self.searchEdit.setObjectName("searchEdit")
+        self.filterLayout.addWidget(self.searchEdit)
+        self.roastFilterCombo = QtWidgets.QComboBox(parent=self.centralwidget)
+        self.roastFilterCombo.setObjectName("roastFilterCombo")
+        self.roastFilterCombo.addItem("")
+        self.roastFilterCombo.addItem("")
+        self.roastFilterCombo.addItem("")
+        self.roastFilterCombo.addItem("")
+        self.filterLayout.addWidget(self.roastFilterCombo)
+        self.typeFilterCombo = QtWidgets.QComboBox(parent=self.centralwidget)
+        self.typeFilterCombo.setObjectName("typeFilterCombo")
+        self.typeFilterCombo.addItem("")
+        self.typeFilterCombo.addItem("")
+        self.typeFilterCombo.addItem("")
+        self.filterLayout.addWidget(self.typeFilterCombo)
+        self.priceLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.priceLabel.setObjectName("priceLabel")
+        self.filterLayout.addWidget(self.priceLabel)
+        self.priceMinSpin = QtWidgets.QDoubleSpinBox(parent=self.centralwidget)
+        self.priceMinSpin.setMaximum(1000000.0)
+        self.priceMinSpin.setObjectName("priceMinSpin")
+        self.filterLayout.addWidget(self.priceMinSpin)
+        self.priceMaxSpin = QtWidgets.QDoubleSpinBox(parent=self.centralwidget)
+        self.priceMaxSpin.setMaximum(1000000.0)
+        self.priceMaxSpin.setObjectName("priceMaxSpin")
+        self.filterLayout.addWidget(self.priceMaxSpin)
+        self.volumeLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.volumeLabel.setObjectName("volumeLabel")
+        self.filterLayout.addWidget(self.volumeLabel)
+        self.volumeMinSpin = QtWidgets.QDoubleSpinBox(parent=self.centralwidget)
+        self.volumeMinSpin.setMaximum(1000000.0)
+        self.volumeMinSpin.setObjectName("volumeMinSpin")
+        self.filterLayout.addWidget(self.volumeMinSpin)
+        self.volumeMaxSpin = QtWidgets.QDoubleSpinBox(parent=self.centralwidget)
+        self.volumeMaxSpin.setMaximum(1000000.0)
+        self.volumeMaxSpin.setObjectName("volumeMaxSpin")
+        self.filterLayout.addWidget(self.volumeMaxSpin)
+        self.resetFilterButton = QtWidgets.QPushButton(parent=self.centralwidget)
+        self.resetFilterButton.setObjectName("resetFilterButton")
+        self.filterLayout.addWidget(self.resetFilterButton)
+        self.verticalLayout.addLayout(self.filterLayout)
+        self.tableView = QtWidgets.QTableView(parent=self.centralwidget)
+        self.tableView.setAlternatingRowColors(True)
+        self.tableView.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tableView.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.tableView.setSortingEnabled(True)
+        self.tableView.setObjectName("tableView")
+        self.verticalLayout.addWidget(self.tableView)
         MainWindow.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(parent=MainWindow)
+        self.menubar.setObjectName("menubar")
+        self.menuFile = QtWidgets.QMenu(parent=self.menubar)
+        self.menuFile.setObjectName("menuFile")
+        self.menuReports = QtWidgets.QMenu(parent=self.menubar)
+        self.menuReports.setObjectName("menuReports")
+        MainWindow.setMenuBar(self.menubar)
+        self.actionImport = QtGui.QAction(parent=MainWindow)
+        self.actionImport.setObjectName("actionImport")
+        self.actionExport = QtGui.QAction(parent=MainWindow)
+        self.actionExport.setObjectName("actionExport")
+        self.actionSnapshot = QtGui.QAction(parent=MainWindow)
+        self.actionSnapshot.setObjectName("actionSnapshot")
+        self.actionRestore = QtGui.QAction(parent=MainWindow)
+        self.actionRestore.setObjectName("actionRestore")
+        self.actionAnalytics = QtGui.QAction(parent=MainWindow)
+        self.actionAnalytics.setObjectName("actionAnalytics")
+        self.menuFile.addAction(self.actionImport)
+        self.menuFile.addAction(self.actionExport)
+        self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionSnapshot)
+        self.menuFile.addAction(self.actionRestore)
+        self.menuReports.addAction(self.actionAnalytics)
+        self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuReports.menuAction())
 
         self.retranslateUi(MainWindow)
         QtCore.QMetaObject.connectSlotsByName(MainWindow)
@@ -87,4 +155,26 @@ class Ui_MainWindow(object):
         self.label.setText(_translate("MainWindow", "Каталог кофе"))
         self.addButton.setText(_translate("MainWindow", "Добавить кофе"))
         self.editButton.setText(_translate("MainWindow", "Редактировать"))
-        self.deleteButton.setText(_translate("MainWindow", "Удалить"))
\ No newline at end of file
+        self.deleteButton.setText(_translate("MainWindow", "Удалить"))
+        self.searchEdit.setPlaceholderText(_translate("MainWindow", "Поиск по названию и описанию"))
+        self.roastFilterCombo.setItemText(0, _translate("MainWindow", "Любая обжарка"))
+        self.roastFilterCombo.setItemText(1, _translate("MainWindow", "Светлая"))
+        self.roastFilterCombo.setItemText(2, _translate("MainWindow", "Средняя"))
+        self.roastFilterCombo.setItemText(3, _translate("MainWindow", "Темная"))
+        self.typeFilterCombo.setItemText(0, _translate("MainWindow", "Любой тип"))
+        self.typeFilterCombo.setItemText(1, _translate("MainWindow", "Зерна"))
+        self.typeFilterCombo.setItemText(2, _translate("MainWindow", "Молотый"))
+        self.priceLabel.setText(_translate("MainWindow", "Цена:"))
+        self.priceMinSpin.setSpecialValueText(_translate("MainWindow", "от"))
+        self.priceMaxSpin.setSpecialValueText(_translate("MainWindow", "до"))
+        self.volumeLabel.setText(_translate("MainWindow", "Объем:"))
+        self.volumeMinSpin.setSpecialValueText(_translate("MainWindow", "от"))
+        self.volumeMaxSpin.setSpecialValueText(_translate("MainWindow", "до"))
+        self.resetFilterButton.setText(_translate("MainWindow", "Сбросить"))
+        self.menuFile.setTitle(_translate("MainWindow", "Файл"))
+        self.actionImport.setText(_translate("MainWindow", "Импорт..."))
+        self.actionExport.setText(_translate("MainWindow", "Экспорт..."))
+        self.actionSnapshot.setText(_translate("MainWindow", "Создать снимок"))
+        self.actionRestore.setText(_translate("MainWindow", "Восстановить из снимка..."))
+        self.menuReports.setTitle(_translate("MainWindow", "Отчеты"))
+        self.actionAnalytics.setText(_translate("MainWindow", "Аналитика..."))
\ No newline at end of file
@@ -0,0 +1,128 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget,
+                             QTableWidgetItem, QPushButton, QHeaderView, QMessageBox)
+from PyQt6.QtCore import Qt, QTimer
+
+from catalog import analytics
+from workers import run_read
+
+GROUP_COLUMNS = ['Обжарка', 'Тип', 'Позиций', 'Средняя цена', 'Мин. цена', 'Макс. цена',
+                 'Средний объем (г)', 'Руб. за грамм']
+GROUP_KEYS = ['count', 'price_avg', 'price_min', 'price_max', 'volume_avg', 'price_per_gram_avg']
+DISTRIBUTION_COLUMNS = ['Цена от', 'Цена до', 'Позиций']
+ALL = 'Все'
+REFRESH_INTERVAL_MS = 2000
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+def make_table(columns, parent):
+    table = QTableWidget(0, len(columns), parent)
+    table.setHorizontalHeaderLabels(columns)
+    table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+    table.verticalHeader().hide()
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+    return table
+
+
+def fill_row(table, row, values):
+    for column, value in enumerate(values):
+        item = QTableWidgetItem(format_value(value))
+        if not isinstance(value, str):
+            item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        table.setItem(row, column, item)
+
+
+class AnalyticsDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Аналитика")
+        self.resize(860, 560)
+        self.seq = None
+        self.task = None
+
+        self.totalLabel = QLabel(self)
+        self.groupTable = make_table(GROUP_COLUMNS, self)
+        self.distributionTable = make_table(DISTRIBUTION_COLUMNS, self)
+        self.quartileLabel = QLabel(self)
+
+        self.refreshButton = QPushButton("Обновить", self)
+        self.closeButton = QPushButton("Закрыть", self)
+        self.refreshButton.clicked.connect(self.refresh)
+        self.closeButton.clicked.connect(self.accept)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.refreshButton)
+        buttons.addStretch()
+        buttons.addWidget(self.closeButton)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.totalLabel)
+        layout.addWidget(self.groupTable, 3)
+        layout.addWidget(QLabel("Распределение цен", self))
+        layout.addWidget(self.distributionTable, 2)
+        layout.addWidget(self.quartileLabel)
+        layout.addLayout(buttons)
+
+        # The summary is cached until the catalog changes, so a refresh that
+        # finds nothing new costs one small query on a worker thread.
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setInterval(REFRESH_INTERVAL_MS)
+        self.refreshTimer.timeout.connect(self.refresh)
+        self.refreshTimer.start()
+        self.totalLabel.setText("Загрузка...")
+        self.refresh()
+
+    def refresh(self):
+        if self.task is not None:
+            return
+        self.task = run_read(analytics.summary, on_finished=self.on_summary_loaded,
+                             on_failed=self.on_summary_failed)
+
+    def on_summary_loaded(self, summary):
+        self.task = None
+        if summary['seq'] == self.seq:
+            return
+        self.seq = summary['seq']
+        self.show_summary(summary)
+
+    def on_summary_failed(self, error):
+        self.task = None
+        self.refreshTimer.stop()
+        QMessageBox.critical(self, "Ошибка", f"Ошибка базы данных: {error}")
+
+    def show_summary(self, summary):
+        total = summary['total']
+        if not total['count']:
+            self.totalLabel.setText("Каталог пуст")
+        else:
+            self.totalLabel.setText(
+                f"Всего позиций: {total['count']}, средняя цена: {total['price_avg']:.2f} руб., "
+                f"в среднем {total['price_per_gram_avg']:.2f} руб. за грамм")
+
+        rows = [(group['roast_degree'], group['type'], group) for group in summary['groups']]
+        rows += [(group['roast_degree'], ALL, group) for group in summary['by_roast_degree']]
+        rows += [(ALL, group['type'], group) for group in summary['by_type']]
+        rows.append((ALL, ALL, total))
+        self.groupTable.setRowCount(len(rows))
+        for row, (roast_degree, coffee_type, stats) in enumerate(rows):
+            fill_row(self.groupTable, row,
+                     [roast_degree, coffee_type] + [stats[key] for key in GROUP_KEYS])
+
+        distribution = summary['price_distribution']
+        self.distributionTable.setRowCount(len(distribution['buckets']))
+        for row, bucket in enumerate(distribution['buckets']):
+            fill_row(self.distributionTable, row, [bucket['from'], bucket['to'], bucket['count']])
+        quartiles = distribution['quartiles']
+        if quartiles[0] is None:
+            self.quartileLabel.clear()
+        else:
+            self.quartileLabel.setText(
+                "Квартили цены: " + ", ".join(f"{value:.2f}" for value in quartiles))
+
+    def done(self, result):
+        self.refreshTimer.stop()
+        super().done(result)
@@ -0,0 +1,321 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from catalog import CatalogRepository, set_database_path, close_connection
+from catalog.validation import ROAST_DEGREES, COFFEE_TYPES
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+MUTATION_SAMPLES = 200
+BULK_ROWS = 10000
+PAGE_SIZE = 256
+
+_app = None
+
+ORIGINS = ('Эфиопия', 'Колумбия', 'Кения', 'Бразилия', 'Гватемала', 'Коста Рика', 'Перу')
+NOTES = ('цитрусовые', 'шоколадные', 'ягодные', 'ореховые', 'карамельные', 'пряные')
+
+
+def synthetic_rows(count, seed=0):
+    rng = random.Random(seed)
+    for number in range(count):
+        origin = rng.choice(ORIGINS)
+        yield (
+            f"{origin} {number}",
+            rng.choice(ROAST_DEGREES),
+            rng.choice(COFFEE_TYPES),
+            f"{rng.choice(NOTES).capitalize()} ноты, партия {number}",
+            float(rng.randrange(300, 3000, 10)),
+            float(rng.choice((200, 250, 300, 500, 1000))),
+        )
+
+
+def build_catalog(path, size):
+    repository = CatalogRepository.open(path)
+    repository.prepare(seed=False)
+    rows = synthetic_rows(size)
+    while True:
+        chunk = [row for _, row in zip(range(BULK_ROWS), rows)]
+        if not chunk:
+            break
+        repository.insert_many(chunk)
+    repository.update_statistics()
+    repository.close()
+
+
+def measure(func, *args, memory=True):
+    # Seconds and peak memory come from separate runs: tracemalloc hooks
+    # every allocation and would inflate the time. The timed run goes first,
+    # so a cold open is still measured cold.
+    gc.collect()
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'median': statistics.median(samples),
+        'p95': samples[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0],
+        'samples': len(samples),
+    }
+
+
+def cold_open(path):
+    repository = CatalogRepository.open(path)
+    repository.prepare(seed=False)
+    repository.count()
+    repository.page(None, 'id', False, None, PAGE_SIZE)
+    repository.close()
+
+
+def page_through(path):
+    repository = CatalogRepository.open(path)
+    rows = 0
+    after = None
+    while True:
+        page = repository.page(None, 'id', False, after, PAGE_SIZE)
+        if not page:
+            break
+        rows += len(page)
+        after = (page[-1].id, page[-1].id)
+    repository.close()
+    return rows
+
+
+def load_model(path):
+    from PyQt6.QtWidgets import QApplication
+    from table_model import CoffeeTableModel
+    from workers import wait_for_all
+
+    global _app
+    # The application (and the global thread pool it owns) must outlive every
+    # size in the run.
+    if _app is None:
+        _app = QApplication.instance() or QApplication([])
+    app = _app
+    set_database_path(path)
+    model = CoffeeTableModel()
+    model.reload()
+    while model.canFetchMore() or model.task is not None:
+        if model.canFetchMore():
+            model.fetchMore()
+        app.processEvents()
+    wait_for_all()
+    app.processEvents()
+    return app, model
+
+
+def populate_model(path):
+    _, model = load_model(path)
+    return model.rowCount()
+
+
+def model_mutations(path):
+    # The edit and delete paths of the main window: the write, then the
+    # patch of a fully loaded model. The patch is also reported on its own.
+    from workers import wait_for_all
+
+    app, model = load_model(path)
+    repository = CatalogRepository.open(path)
+    rng = random.Random(3)
+    ids = rng.sample(list(model.rows.ids), min(len(model.rows), MUTATION_SAMPLES * 2))
+    edit_ids, delete_ids = ids[:len(ids) // 2], ids[len(ids) // 2:]
+    data = {'name': 'Бенчмарк GUI', 'roast_degree': ROAST_DEGREES[1], 'type': COFFEE_TYPES[1],
+            'description': 'изменено в модели', 'price': '555', 'volume': '500'}
+
+    edits, edit_patches = [], []
+    for coffee_id in edit_ids:
+        started = time.perf_counter()
+        record = repository.update(coffee_id, data)
+        patched = time.perf_counter()
+        model.record_saved(record)
+        finished = time.perf_counter()
+        edits.append(finished - started)
+        edit_patches.append(finished - patched)
+
+    deletes, delete_patches = [], []
+    for coffee_id in delete_ids:
+        started = time.perf_counter()
+        repository.delete(coffee_id)
+        patched = time.perf_counter()
+        model.record_deleted(coffee_id)
+        finished = time.perf_counter()
+        deletes.append(finished - started)
+        delete_patches.append(finished - patched)
+
+    repository.close()
+    wait_for_all()
+    app.processEvents()
+    return ({**summarize(edits), 'model': summarize(edit_patches)},
+            {**summarize(deletes), 'model': summarize(delete_patches)})
+
+
+def search_queries(path):
+    repository = CatalogRepository.open(path)
+    timings = {}
+    for name, filters, sort_field in (
+            ('text', {'search': 'Кения'}, 'name'),
+            ('roast_type', {'roast_degree': ROAST_DEGREES[2], 'type': COFFEE_TYPES[0]}, 'price'),
+            ('price_range', {'price_min': 1000.0, 'price_max': 1200.0}, 'volume')):
+        started = time.perf_counter()
+        repository.count(filters)
+        repository.page(filters, sort_field, False, None, PAGE_SIZE)
+        timings[name] = time.perf_counter() - started
+    repository.close()
+    return timings
+
+
+def mutations(path, size):
+    repository = CatalogRepository.open(path)
+    rng = random.Random(1)
+    ids = rng.sample(range(1, size + 1), min(size, MUTATION_SAMPLES * 2))
+    edit_ids, delete_ids = ids[:len(ids) // 2], ids[len(ids) // 2:]
+    data = {'name': 'Бенчмарк', 'roast_degree': ROAST_DEGREES[0], 'type': COFFEE_TYPES[0],
+            'description': 'изменено', 'price': '999', 'volume': '250'}
+
+    edits = []
+    for coffee_id in edit_ids:
+        started = time.perf_counter()
+        repository.update(coffee_id, data)
+        edits.append(time.perf_counter() - started)
+
+    deletes = []
+    for coffee_id in delete_ids:
+        started = time.perf_counter()
+        repository.delete(coffee_id)
+        deletes.append(time.perf_counter() - started)
+
+    rows = list(synthetic_rows(BULK_ROWS, seed=2))
+    started = time.perf_counter()
+    repository.insert_many(rows)
+    bulk = time.perf_counter() - started
+    repository.close()
+    return summarize(edits), summarize(deletes), bulk
+
+
+def run_size(size, workdir, gui):
+    path = os.path.join(workdir, f'coffee-{size}.sqlite')
+    result = {'rows': size}
+
+    elapsed, _, _ = measure(build_catalog, path, size, memory=False)
+    result['generate_seconds'] = elapsed
+
+    elapsed, peak, _ = measure(cold_open, path)
+    result['cold_open'] = {'seconds': elapsed, 'peak_bytes': peak}
+
+    elapsed, peak, rows = measure(page_through, path)
+    result['page_through'] = {'seconds': elapsed, 'peak_bytes': peak, 'rows': rows}
+
+    if gui:
+        elapsed, peak, rows = measure(populate_model, path)
+        result['populate_model'] = {'seconds': elapsed, 'peak_bytes': peak, 'rows': rows}
+        close_connection()
+
+    result['search'] = search_queries(path)
+
+    edit, delete, bulk = mutations(path, size)
+    result['edit'] = edit
+    result['delete'] = delete
+    result['bulk_insert'] = {'rows': BULK_ROWS, 'seconds': bulk,
+                             'rows_per_second': BULK_ROWS / bulk}
+
+    if gui:
+        result['gui_edit'], result['gui_delete'] = model_mutations(path)
+        close_connection()
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path, report):
+    with open(old_path, encoding='utf-8') as file:
+        old = {entry['rows']: entry for entry in json.load(file)['results']}
+    print(f"\nСравнение с {old_path}:")
+    for entry in report['results']:
+        before = old.get(entry['rows'])
+        if before is None:
+            continue
+        for key in ('cold_open', 'page_through', 'populate_model', 'bulk_insert'):
+            if key in entry and key in before:
+                ratio = entry[key]['seconds'] / before[key]['seconds']
+                print(f"  {entry['rows']:>8} {key:<15} x{ratio:.2f}")
+        for key in ('edit', 'delete', 'gui_edit', 'gui_delete'):
+            if key not in entry or key not in before:
+                continue
+            ratio = entry[key]['median'] / before[key]['median']
+            print(f"  {entry['rows']:>8} {key:<15} x{ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк загрузки, поиска и изменения каталога")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--no-gui', action='store_true',
+                        help="не замерять заполнение и изменение Qt-модели")
+    parser.add_argument('--output', help="файл JSON с результатами")
+    parser.add_argument('--compare', help="предыдущий файл JSON для сравнения")
+    args = parser.parse_args(argv)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'results': [],
+    }
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as workdir:
+        for size in args.sizes:
+            print(f"{size} записей...", file=sys.stderr, flush=True)
+            report['results'].append(run_size(size, workdir, not args.no_gui))
+    if resource is not None:
+        report['max_rss_kib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    output = args.output or os.path.join(
+        ROOT, 'benchmarks', 'results', f"bench-{report['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(output)
+
+    if args.compare:
+        compare(args.compare, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+from catalog.db import (get_database_path, set_database_path, connect,
+                        get_connection, close_connection)
+from catalog.records import FIELDS, CoffeeRecord
+from catalog.cache import RecordCache
+from catalog.repository import CatalogRepository, get_repository
+from catalog.query import SORTABLE_FIELDS
+from catalog.validation import (ROAST_DEGREES, COFFEE_TYPES, BULK_FIELDS, validate_coffee,
+                                validate_changes)
+
+__all__ = [
+    'get_database_path', 'set_database_path', 'connect', 'get_connection',
+    'close_connection',
+    'FIELDS', 'CoffeeRecord', 'RecordCache', 'CatalogRepository', 'get_repository',
+    'SORTABLE_FIELDS', 'ROAST_DEGREES', 'COFFEE_TYPES', 'BULK_FIELDS', 'validate_coffee',
+    'validate_changes',
+]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Optional
+
+HISTOGRAM_BUCKETS = 10
+QUARTILES = (0.25, 0.5, 0.75)
+
+GROUP_SQL = '''
+SELECT roast_degrees.name, coffee_types.name, grouped.*
+FROM (
+    SELECT roast_id, type_id, COUNT(*), SUM(price), SUM(volume), SUM(price / volume),
+           MIN(price), MAX(price)
+    FROM coffee
+    GROUP BY roast_id, type_id
+) AS grouped
+JOIN roast_degrees ON roast_degrees.id = grouped.roast_id
+JOIN coffee_types ON coffee_types.id = grouped.type_id
+ORDER BY roast_degrees.name, coffee_types.name
+'''
+
+
+def new_stats():
+    return {'count': 0, 'price_sum': 0.0, 'volume_sum': 0.0, 'per_gram_sum': 0.0,
+            'price_min': None, 'price_max': None}
+
+
+def add_stats(stats, other):
+    stats['count'] += other['count']
+    stats['price_sum'] += other['price_sum']
+    stats['volume_sum'] += other['volume_sum']
+    stats['per_gram_sum'] += other['per_gram_sum']
+    for key, pick in (('price_min', min), ('price_max', max)):
+        if other[key] is not None:
+            stats[key] = other[key] if stats[key] is None else pick(stats[key], other[key])
+    return stats
+
+
+def finish_stats(stats):
+    count = stats['count']
+    return {
+        'count': count,
+        'price_avg': stats['price_sum'] / count if count else None,
+        'price_min': stats['price_min'],
+        'price_max': stats['price_max'],
+        'volume_avg': stats['volume_sum'] / count if count else None,
+        'price_per_gram_avg': stats['per_gram_sum'] / count if count else None,
+    }
+
+
+def price_distribution(conn, count, low, high, buckets=HISTOGRAM_BUCKETS):
+    if not count:
+        return {'buckets': [], 'quartiles': [None] * len(QUARTILES)}
+    if low == high:
+        # Every row has the same price: one bucket instead of ten empty ones.
+        return {'buckets': [{'from': low, 'to': high, 'count': count}],
+                'quartiles': [low] * len(QUARTILES)}
+    width = (high - low) / buckets
+    bounds = [low + number * width for number in range(1, buckets)]
+    # Each count is a range scan of idx_coffee_price; bucket sizes are the
+    # differences of the running counts, so no rows are grouped or sorted.
+    below = [0] + [conn.execute("SELECT COUNT(*) FROM coffee WHERE price < ?",
+                                (bound,)).fetchone()[0] for bound in bounds] + [count]
+    edges = [low] + bounds + [high]
+    # OFFSET steps over rows one by one, so each quartile is looked up from
+    # the start of the bucket that holds it: the walk is at most one bucket
+    # long rather than three quarters of the table.
+    quartiles = []
+    for fraction in QUARTILES:
+        rank = min(count - 1, int(count * fraction))
+        number = bisect.bisect_right(below, rank) - 1
+        quartiles.append(conn.execute(
+            "SELECT price FROM coffee WHERE price >= ? ORDER BY price LIMIT 1 OFFSET ?",
+            (edges[number], rank - below[number])).fetchone()[0])
+    return {
+        'buckets': [{'from': edges[number], 'to': edges[number + 1],
+                     'count': below[number + 1] - below[number]}
+                    for number in range(buckets)],
+        'quartiles': quartiles,
+    }
+
+
+def compute_summary(conn) -> dict:
+    # One pass over idx_coffee_stats gives every per-(roast, type) figure;
+    # the per-roast, per-type and overall rows are folded from those few
+    # groups in Python rather than read again.
+    groups = []
+    total = new_stats()
+    by_roast = {}
+    by_type = {}
+    for roast_degree, coffee_type, _, _, *values in conn.execute(GROUP_SQL):
+        stats = dict(zip(('count', 'price_sum', 'volume_sum', 'per_gram_sum',
+                          'price_min', 'price_max'), values))
+        groups.append({'roast_degree': roast_degree, 'type': coffee_type, **finish_stats(stats)})
+        add_stats(total, stats)
+        add_stats(by_roast.setdefault(roast_degree, new_stats()), stats)
+        add_stats(by_type.setdefault(coffee_type, new_stats()), stats)
+    return {
+        'total': finish_stats(total),
+        'groups': groups,
+        'by_roast_degree': [{'roast_degree': name, **finish_stats(stats)}
+                            for name, stats in by_roast.items()],
+        'by_type': [{'type': name, **finish_stats(stats)}
+                    for name, stats in sorted(by_type.items())],
+        'price_distribution': price_distribution(
+            conn, total['count'], total['price_min'], total['price_max']),
+    }
+
+
+class SummaryCache:
+    # The summary of the whole catalog, kept until the change log moves.
+    # Shared by every thread of a process; a reader that finds it stale
+    # recomputes it inside one read transaction, so the figures and the
+    # sequence they are stored under always describe the same snapshot.
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.seq: Optional[int] = None
+        self.summary: Optional[dict] = None
+
+    def get(self, repository) -> dict:
+        conn = repository.conn
+        with conn:
+            conn.execute("BEGIN")
+            seq = repository.last_change()
+            with self.lock:
+                if seq == self.seq:
+                    return self.summary
+            summary = {'seq': seq, **compute_summary(conn)}
+        with self.lock:
+            self.seq = seq
+            self.summary = summary
+        return summary
+
+    def clear(self) -> None:
+        with self.lock:
+            self.seq = None
+            self.summary = None
+
+
+_cache = SummaryCache()
+
+
+def summary(repository) -> dict:
+    return _cache.get(repository)
@@ -0,0 +1,161 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+
+from catalog.repository import CatalogRepository
+from catalog.validation import validate_coffee, coffee_values
+
+FIELDS = ('name', 'roast_degree', 'type', 'description', 'price', 'volume')
+CHUNK_SIZE = 10000
+MAX_REJECTED = 1000
+
+
+def clean_record(raw):
+    if not isinstance(raw, dict):
+        raise ValueError("Запись должна быть объектом")
+    record = {}
+    for field in FIELDS:
+        value = raw.get(field)
+        record[field] = value.strip() if isinstance(value, str) else value
+    return record
+
+
+def read_item(raw):
+    # A record that cannot even be read is handed on as its error, so it is
+    # counted as rejected like any other bad row instead of ending the import.
+    try:
+        return clean_record(raw)
+    except ValueError as e:
+        return e
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        reader = csv.DictReader(file)
+        while True:
+            try:
+                raw = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield ValueError(f"Некорректная строка CSV: {e}")
+                continue
+            yield read_item(raw)
+
+
+def read_json(path):
+    with open(path, encoding='utf-8') as file:
+        first = file.read(1)
+        while first.isspace():
+            first = file.read(1)
+        file.seek(0)
+        # A .jsonl file is always read line by line, even if a line is an array.
+        if first == '[' and os.path.splitext(path)[1].lower() != '.jsonl':
+            # A plain JSON array cannot be streamed with the standard library;
+            # JSON Lines files (one object per line) are read lazily below.
+            for raw in json.load(file):
+                yield read_item(raw)
+            return
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                raw = json.loads(line)
+            except ValueError as e:
+                yield ValueError(f"Некорректный JSON: {e}")
+                continue
+            yield read_item(raw)
+
+
+def read_records(path):
+    if os.path.splitext(path)[1].lower() == '.csv':
+        return read_csv(path)
+    return read_json(path)
+
+
+def validated_rows(records, result):
+    for number, record in enumerate(records, start=1):
+        error = str(record) if isinstance(record, ValueError) else validate_coffee(record)
+        if error:
+            result['rejected'] += 1
+            if len(result['errors']) < MAX_REJECTED:
+                result['errors'].append((number, error))
+            continue
+        yield coffee_values(record)
+
+
+def import_records(repository, records, chunk_size=CHUNK_SIZE, progress=None):
+    result = {'imported': 0, 'rejected': 0, 'errors': []}
+    rows = validated_rows(records, result)
+    while True:
+        # Bounded memory, far fewer fsyncs than committing row by row, and a
+        # failure only loses the current chunk.
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        result['imported'] += repository.insert_many(chunk)
+        if progress is not None:
+            progress(result['imported'])
+    repository.update_statistics()
+    return result
+
+
+def import_file(repository, path, progress=None):
+    return import_records(repository, read_records(path), progress=progress)
+
+
+def export_file(repository, path, filters=None, progress=None):
+    exported = 0
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        if os.path.splitext(path)[1].lower() == '.csv':
+            writer = csv.writer(file)
+            writer.writerow(FIELDS)
+            write = writer.writerow
+        else:
+            write = lambda row: file.write(
+                json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n')
+        for row in repository.iter_all(filters):
+            write(row[1:])
+            exported += 1
+            if progress is not None and exported % CHUNK_SIZE == 0:
+                progress(exported)
+    if progress is not None:
+        progress(exported)
+    return exported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m catalog.bulk",
+                                     description="Импорт и экспорт каталога кофе")
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('path', help="CSV или JSON Lines файл")
+    parser.add_argument('--database', help="путь к coffee.sqlite")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    report = lambda count: print(f"\r{count} записей", end='', file=sys.stderr, flush=True)
+    repository = CatalogRepository.open(args.database)
+    try:
+        repository.prepare(seed=False)
+        if args.command == 'import':
+            result = import_records(
+                repository, read_records(args.path), args.chunk_size, report)
+            print(file=sys.stderr)
+            print(f"Импортировано: {result['imported']}, отклонено: {result['rejected']}")
+            for number, error in result['errors']:
+                print(f"  запись {number}: {error}")
+            return 1 if result['rejected'] else 0
+        exported = export_file(repository, args.path, progress=report)
+        print(file=sys.stderr)
+        print(f"Экспортировано: {exported}")
+        return 0
+    finally:
+        repository.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
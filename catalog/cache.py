@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from catalog.records import CoffeeRecord
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class RecordCache:
+    # Id-keyed LRU of records already read from the database. The cache is
+    # tied to the change-log seq its owner has caught up to: when a check
+    # finds the log has moved on, everything cached is dropped.
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self.records: OrderedDict[int, CoffeeRecord] = OrderedDict()
+        self.version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def check_version(self, version: int) -> bool:
+        if version == self.version:
+            return True
+        self.records.clear()
+        self.version = version
+        return False
+
+    def get(self, coffee_id: int) -> Optional[CoffeeRecord]:
+        record = self.records.get(coffee_id)
+        if record is not None:
+            self.records.move_to_end(coffee_id)
+        return record
+
+    def put(self, record: CoffeeRecord) -> None:
+        self.records[record.id] = record
+        self.records.move_to_end(record.id)
+        if len(self.records) > self.max_size:
+            self.records.popitem(last=False)
+
+    def put_many(self, records: Iterable[CoffeeRecord]) -> None:
+        for record in records:
+            self.records[record.id] = record
+            self.records.move_to_end(record.id)
+        while len(self.records) > self.max_size:
+            self.records.popitem(last=False)
+
+    def discard(self, coffee_id: int) -> None:
+        self.records.pop(coffee_id, None)
+
+    def clear(self) -> None:
+        self.records.clear()
+        self.version = None
@@ -0,0 +1,74 @@
+import os
+import sys
+import sqlite3
+import threading
+
+CACHE_SIZE_KIB = 16 * 1024
+MMAP_SIZE = 256 * 1024 * 1024
+STATEMENT_CACHE_SIZE = 256
+BUSY_TIMEOUT = 5.0
+
+# Thread id -> (connection, path). Not a threading.local: Qt pool threads
+# get a fresh Python thread state for every task they run, which would
+# empty a threading.local between tasks and reconnect each time.
+_connections = {}
+_lock = threading.Lock()
+_database_path = None
+
+
+def set_database_path(path):
+    global _database_path
+    _database_path = path
+
+
+def get_database_path():
+    if _database_path is not None:
+        return _database_path
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    return os.path.join(base_path, 'data', 'coffee.sqlite')
+
+
+def connect(db_path=None):
+    if db_path is None:
+        db_path = get_database_path()
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    # WAL lets readers and a writer work on the same file at once, so the GUI
+    # and batch tools sharing coffee.sqlite do not block each other.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def get_connection():
+    # One long-lived connection per thread: sqlite3 connections must not be
+    # shared across threads, but each thread reuses its own for every call.
+    ident = threading.get_ident()
+    path = get_database_path()
+    with _lock:
+        conn, conn_path = _connections.get(ident, (None, None))
+    if conn is not None and conn_path == path:
+        return conn
+    if conn is not None:
+        conn.close()
+    conn = connect(path)
+    with _lock:
+        _connections[ident] = (conn, path)
+    return conn
+
+
+def close_connection():
+    with _lock:
+        conn, _ = _connections.pop(threading.get_ident(), (None, None))
+    if conn is not None:
+        conn.close()
@@ -0,0 +1,280 @@
+import sqlite3
+
+from catalog.validation import ROAST_DEGREES, COFFEE_TYPES
+
+FTS_INSERT_TRIGGER = '''
+CREATE TRIGGER IF NOT EXISTS coffee_fts_insert AFTER INSERT ON coffee BEGIN
+    INSERT INTO coffee_fts(rowid, name, description)
+    VALUES (new.id, new.name, new.description);
+END
+'''
+
+CHANGE_INSERT_TRIGGER = '''
+CREATE TRIGGER IF NOT EXISTS coffee_changes_insert AFTER INSERT ON coffee BEGIN
+    INSERT INTO coffee_changes(coffee_id, op) VALUES (new.id, 'I');
+END
+'''
+
+# Unix time with fractions of a second; SQLite 3.40 has no unixepoch('subsec').
+NOW_SQL = "(julianday('now') - 2440587.5) * 86400.0"
+
+HISTORY_INSERT_TRIGGER = f'''
+CREATE TRIGGER IF NOT EXISTS coffee_history_insert AFTER INSERT ON coffee BEGIN
+    INSERT INTO price_history(coffee_id, changed_at, price, volume)
+    VALUES (new.id, {NOW_SQL}, new.price, new.volume);
+END
+'''
+
+LOOKUPS = (
+    ('roast_degrees', 'roast_degree', ROAST_DEGREES),
+    ('coffee_types', 'type', COFFEE_TYPES),
+)
+
+
+def create_fts_triggers(conn):
+    conn.execute(FTS_INSERT_TRIGGER)
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS coffee_fts_delete AFTER DELETE ON coffee BEGIN
+        INSERT INTO coffee_fts(coffee_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS coffee_fts_update AFTER UPDATE OF name, description ON coffee BEGIN
+        INSERT INTO coffee_fts(coffee_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO coffee_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    ''')
+
+
+def initial_schema(conn):
+    # The schema as it was before versioning. Files created by older builds
+    # already have some or all of it, hence IF NOT EXISTS throughout.
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS coffee (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        roast_degree TEXT NOT NULL,
+        type TEXT NOT NULL,
+        description TEXT,
+        price REAL NOT NULL,
+        volume REAL NOT NULL
+    )
+    ''')
+    has_fts = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'coffee_fts'").fetchone()
+    if has_fts is None:
+        # External-content FTS5 index over name/description; the triggers keep
+        # it in step with every insert, update and delete on coffee.
+        conn.execute('''
+        CREATE VIRTUAL TABLE coffee_fts USING fts5(
+            name, description, content='coffee', content_rowid='id', prefix='2 3'
+        )
+        ''')
+        conn.execute("INSERT INTO coffee_fts(coffee_fts) VALUES('rebuild')")
+    create_fts_triggers(conn)
+
+
+def lookup_tables(conn):
+    # Roast degree and type move to lookup tables with integer keys. Ids are
+    # handed out in name order, legacy values included, so ordering by the
+    # key is the same as ordering by the text the UI shows.
+    for table, column, known in LOOKUPS:
+        conn.execute(f'''
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE CHECK (name <> '')
+        )
+        ''')
+        names = set(known)
+        names.update(name for name, in conn.execute(f"SELECT DISTINCT {column} FROM coffee")
+                     if name)
+        conn.executemany(f"INSERT INTO {table} (name) VALUES (?)",
+                         [(name,) for name in sorted(names)])
+
+    conn.execute('''
+    CREATE TABLE coffee_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL CHECK (name <> ''),
+        roast_id INTEGER NOT NULL REFERENCES roast_degrees(id),
+        type_id INTEGER NOT NULL REFERENCES coffee_types(id),
+        description TEXT NOT NULL DEFAULT '',
+        price REAL NOT NULL CHECK (typeof(price) = 'real' AND price > 0),
+        volume REAL NOT NULL CHECK (typeof(volume) = 'real' AND volume > 0)
+    )
+    ''')
+    # LEFT JOIN so that a row with an unknown value fails the NOT NULL
+    # constraint and aborts the upgrade instead of being dropped.
+    conn.execute('''
+    INSERT INTO coffee_new (id, name, roast_id, type_id, description, price, volume)
+    SELECT coffee.id, coffee.name, roast_degrees.id, coffee_types.id,
+           COALESCE(coffee.description, ''), coffee.price, coffee.volume
+    FROM coffee
+    LEFT JOIN roast_degrees ON roast_degrees.name = coffee.roast_degree
+    LEFT JOIN coffee_types ON coffee_types.name = coffee.type
+    ''')
+    # Keep the AUTOINCREMENT high-water mark so deleted ids are never reused.
+    seq = conn.execute("SELECT MAX(seq) FROM sqlite_sequence "
+                       "WHERE name IN ('coffee', 'coffee_new')").fetchone()[0]
+    conn.execute("DELETE FROM sqlite_sequence WHERE name = 'coffee_new'")
+    if seq is not None:
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('coffee_new', ?)", (seq,))
+    conn.execute("DROP TABLE coffee")
+    conn.execute("ALTER TABLE coffee_new RENAME TO coffee")
+
+    # Keyset pages are ordered by (column, id); each single-column index
+    # carries the rowid and serves that order directly. The (key, price)
+    # pairs serve the common "filter by roast/type, sort by price" view.
+    conn.execute("CREATE INDEX idx_coffee_name ON coffee(name)")
+    conn.execute("CREATE INDEX idx_coffee_roast ON coffee(roast_id)")
+    conn.execute("CREATE INDEX idx_coffee_roast_price ON coffee(roast_id, price)")
+    conn.execute("CREATE INDEX idx_coffee_type ON coffee(type_id)")
+    conn.execute("CREATE INDEX idx_coffee_type_price ON coffee(type_id, price)")
+    conn.execute("CREATE INDEX idx_coffee_price ON coffee(price)")
+    conn.execute("CREATE INDEX idx_coffee_volume ON coffee(volume)")
+    create_fts_triggers(conn)
+
+    # Readers see the familiar columns; the names come from one primary key
+    # lookup per returned row, which leaves the planner free to walk coffee
+    # in index order.
+    conn.execute('''
+    CREATE VIEW coffee_records AS
+    SELECT id, name,
+           (SELECT name FROM roast_degrees WHERE roast_degrees.id = coffee.roast_id) AS roast_degree,
+           (SELECT name FROM coffee_types WHERE coffee_types.id = coffee.type_id) AS type,
+           description, price, volume, roast_id, type_id
+    FROM coffee
+    ''')
+
+
+def change_log(conn):
+    # Every committed insert, update and delete on coffee leaves a row here.
+    # seq only grows (AUTOINCREMENT never hands out a number twice), so an
+    # instance that remembers the last seq it applied can ask for exactly
+    # the rows touched since then.
+    conn.execute('''
+    CREATE TABLE coffee_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        coffee_id INTEGER NOT NULL,
+        op TEXT NOT NULL CHECK (op IN ('I', 'U', 'D'))
+    )
+    ''')
+    conn.execute(CHANGE_INSERT_TRIGGER)
+    conn.execute('''
+    CREATE TRIGGER coffee_changes_update AFTER UPDATE ON coffee BEGIN
+        INSERT INTO coffee_changes(coffee_id, op) VALUES (new.id, 'U');
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER coffee_changes_delete AFTER DELETE ON coffee BEGIN
+        INSERT INTO coffee_changes(coffee_id, op) VALUES (old.id, 'D');
+    END
+    ''')
+
+
+def analytics_index(conn):
+    # Lets the analytics summary walk one index in (roast, type) order with
+    # every figure it sums at hand, instead of grouping the table rows.
+    conn.execute("CREATE INDEX idx_coffee_stats ON coffee(roast_id, type_id, price, volume)")
+
+
+def price_history(conn):
+    # Append-only log of price and volume, written by triggers in the same
+    # transaction as the change to coffee. It lives beside the catalog, not
+    # in it, so reads of coffee never touch it however long it grows.
+    # Rows outlive their coffee on purpose: history is not rewritten.
+    conn.execute('''
+    CREATE TABLE price_history (
+        id INTEGER PRIMARY KEY,
+        coffee_id INTEGER NOT NULL,
+        changed_at REAL NOT NULL,
+        price REAL NOT NULL,
+        volume REAL NOT NULL
+    )
+    ''')
+    conn.execute("CREATE INDEX idx_price_history_coffee ON price_history(coffee_id, changed_at)")
+    conn.execute("CREATE INDEX idx_price_history_time ON price_history(changed_at)")
+    # What is known today becomes the first entry for every existing coffee.
+    conn.execute(f'''
+    INSERT INTO price_history(coffee_id, changed_at, price, volume)
+    SELECT id, {NOW_SQL}, price, volume FROM coffee
+    ''')
+    conn.execute(HISTORY_INSERT_TRIGGER)
+    conn.execute(f'''
+    CREATE TRIGGER coffee_history_update AFTER UPDATE OF price, volume ON coffee
+    WHEN old.price IS NOT new.price OR old.volume IS NOT new.volume BEGIN
+        INSERT INTO price_history(coffee_id, changed_at, price, volume)
+        VALUES (new.id, {NOW_SQL}, new.price, new.volume);
+    END
+    ''')
+    for event in ('UPDATE', 'DELETE'):
+        conn.execute(f'''
+        CREATE TRIGGER price_history_no_{event.lower()} BEFORE {event} ON price_history BEGIN
+            SELECT RAISE(ABORT, 'price_history is append-only');
+        END
+        ''')
+
+
+MIGRATIONS = [
+    (1, initial_schema),
+    (2, lookup_tables),
+    (3, change_log),
+    (4, analytics_index),
+    (5, price_history),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def database_file(conn):
+    for _, name, path in conn.execute("PRAGMA database_list"):
+        if name == 'main':
+            return path or None
+    return None
+
+
+def backup_database(conn, version):
+    path = database_file(conn)
+    if path is None:
+        return None
+    backup_path = f"{path}.v{version}.bak"
+    target = sqlite3.connect(backup_path)
+    try:
+        conn.backup(target)
+    finally:
+        target.close()
+    return backup_path
+
+
+def migrate(conn):
+    version = schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(
+            f"База данных создана более новой версией программы (схема {version})")
+    if version == SCHEMA_VERSION:
+        return False
+
+    has_table = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'coffee'").fetchone()
+    if has_table is not None:
+        # A copy of the file as it was, in case an upgrade has to be undone.
+        backup_database(conn, version)
+
+    for number, step in MIGRATIONS:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have upgraded while we waited for the lock.
+            if schema_version(conn) < number:
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    return True
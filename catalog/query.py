@@ -0,0 +1,76 @@
+import re
+
+from catalog.records import FIELDS
+
+SORTABLE_FIELDS = ('id', 'name', 'roast_degree', 'type', 'price', 'volume')
+
+# Reads go through the coffee_records view, which adds the lookup names.
+RECORD_SQL = f"SELECT {', '.join(FIELDS)} FROM coffee_records"
+
+# Roast degree and type are stored as lookup keys; filters and sorts work on
+# the key, with the name resolved to it once per statement.
+LOOKUP_COLUMNS = {
+    'roast_degree': ('roast_id', '(SELECT id FROM roast_degrees WHERE name = ?)'),
+    'type': ('type_id', '(SELECT id FROM coffee_types WHERE name = ?)'),
+}
+
+RANGE_FILTERS = (
+    ('price_min', 'price >= ?'),
+    ('price_max', 'price <= ?'),
+    ('volume_min', 'volume >= ?'),
+    ('volume_max', 'volume <= ?'),
+)
+
+
+def match_expression(text):
+    # Every word becomes a quoted prefix query, so user input can never be
+    # parsed as FTS5 syntax.
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def build_filter(filters):
+    clauses = []
+    params = []
+    if not filters:
+        return clauses, params
+
+    match = match_expression(filters.get('search') or '')
+    if match:
+        clauses.append("id IN (SELECT rowid FROM coffee_fts WHERE coffee_fts MATCH ?)")
+        params.append(match)
+    for key, (column, lookup) in LOOKUP_COLUMNS.items():
+        if filters.get(key):
+            clauses.append(f"{column} = {lookup}")
+            params.append(filters[key])
+    for key, clause in RANGE_FILTERS:
+        if filters.get(key) is not None:
+            clauses.append(clause)
+            params.append(filters[key])
+    return clauses, params
+
+
+def where_sql(clauses):
+    return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+def page_query(filters, sort_field, descending, after):
+    # Keyset pagination on (sort field, id): with the matching index every
+    # page is O(limit) no matter how deep the user has scrolled.
+    if sort_field not in SORTABLE_FIELDS:
+        raise ValueError(f"Нельзя сортировать по полю {sort_field}")
+    clauses, params = build_filter(filters)
+    column, value = LOOKUP_COLUMNS.get(sort_field, (sort_field, '?'))
+    op = '<' if descending else '>'
+    if after is not None:
+        if sort_field == 'id':
+            clauses.append(f"id {op} ?")
+            params.append(after[1])
+        else:
+            clauses.append(f"({column}, id) {op} ({value}, ?)")
+            params.extend(after)
+    order = 'DESC' if descending else 'ASC'
+    if sort_field == 'id':
+        order_by = f"id {order}"
+    else:
+        order_by = f"{column} {order}, id {order}"
+    return f"{where_sql(clauses)} ORDER BY {order_by}", params
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+FIELDS = ('id', 'name', 'roast_degree', 'type', 'description', 'price', 'volume')
+
+
+class CoffeeRecord:
+    __slots__ = FIELDS
+
+    id: int
+    name: str
+    roast_degree: str
+    type: str
+    description: Optional[str]
+    price: float
+    volume: float
+
+    def __init__(self, id: int, name: str, roast_degree: str, type: str,
+                 description: Optional[str], price: float, volume: float) -> None:
+        self.id = id
+        self.name = name
+        self.roast_degree = roast_degree
+        self.type = type
+        self.description = description
+        self.price = price
+        self.volume = volume
+
+    @classmethod
+    def from_row(cls, cursor: Any, row: tuple) -> CoffeeRecord:
+        return cls(*row)
+
+    def values(self) -> tuple:
+        return (self.id, self.name, self.roast_degree, self.type,
+                self.description, self.price, self.volume)
+
+    def as_dict(self) -> dict:
+        return dict(zip(FIELDS, self.values()))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CoffeeRecord):
+            return NotImplemented
+        return self.values() == other.values()
+
+    def __repr__(self) -> str:
+        return f"CoffeeRecord(id={self.id!r}, name={self.name!r})"
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+from typing import Iterable, Iterator, Optional
+
+from catalog.db import connect, get_connection
+from catalog.migrations import (FTS_INSERT_TRIGGER, CHANGE_INSERT_TRIGGER,
+                                HISTORY_INSERT_TRIGGER, NOW_SQL)
+from catalog.query import RECORD_SQL, LOOKUP_COLUMNS, build_filter, where_sql, page_query
+from catalog.records import CoffeeRecord
+from catalog.schema import SAMPLE_DATA, ensure_schema, update_statistics
+from catalog.validation import coffee_values, validate_changes, change_values
+
+READ_BACK_CHUNK = 500
+# How many change-log rows survive pruning, and how many distinct ids one
+# delta may carry before a reload is the cheaper way to catch up.
+CHANGE_LOG_KEEP = 10000
+CHANGE_LIMIT = 1000
+
+INSERT_SQL = '''
+INSERT INTO coffee (name, roast_id, type_id, description, price, volume)
+VALUES (?, (SELECT id FROM roast_degrees WHERE name = ?),
+        (SELECT id FROM coffee_types WHERE name = ?), ?, ?, ?)
+'''
+
+UPDATE_SQL = '''
+UPDATE coffee
+SET name = ?, roast_id = (SELECT id FROM roast_degrees WHERE name = ?),
+    type_id = (SELECT id FROM coffee_types WHERE name = ?),
+    description = ?, price = ?, volume = ?
+WHERE id = ?
+'''
+
+
+class CatalogRepository:
+    def __init__(self, conn) -> None:
+        self.conn = conn
+
+    @classmethod
+    def open(cls, db_path: Optional[str] = None) -> CatalogRepository:
+        return cls(connect(db_path))
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def query(self, sql: str, params: Iterable = ()) -> list[CoffeeRecord]:
+        cursor = self.conn.cursor()
+        cursor.row_factory = CoffeeRecord.from_row
+        return cursor.execute(sql, params).fetchall()
+
+    def prepare(self, seed: bool = True) -> None:
+        ensure_schema(self.conn)
+        with self.conn:
+            if seed and self.conn.execute("SELECT 1 FROM coffee LIMIT 1").fetchone() is None:
+                self.conn.executemany(INSERT_SQL, SAMPLE_DATA)
+            self.prune_changes()
+        update_statistics(self.conn)
+
+    def reset(self) -> None:
+        ensure_schema(self.conn)
+        with self.conn:
+            self.conn.execute("DELETE FROM coffee")
+            self.conn.executemany(INSERT_SQL, SAMPLE_DATA)
+
+    def count(self, filters: Optional[dict] = None) -> int:
+        clauses, params = build_filter(filters)
+        sql = f"SELECT COUNT(*) FROM coffee{where_sql(clauses)}"
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def get(self, coffee_id: int) -> Optional[CoffeeRecord]:
+        rows = self.query(f"{RECORD_SQL} WHERE id = ?", (coffee_id,))
+        return rows[0] if rows else None
+
+    def page(self, filters: Optional[dict], sort_field: str, descending: bool,
+             after: Optional[tuple], limit: int) -> list[CoffeeRecord]:
+        sql, params = page_query(filters, sort_field, descending, after)
+        return self.query(f"{RECORD_SQL}{sql} LIMIT ?", params + [limit])
+
+    def first_page(self, filters: Optional[dict], sort_field: str, descending: bool,
+                   limit: int) -> dict:
+        # The first page together with the change-log position it reflects,
+        # read in one transaction: every change the page misses is after seq.
+        with self.conn:
+            self.conn.execute("BEGIN")
+            seq = self.last_change()
+            records = self.page(filters, sort_field, descending, None, limit)
+        return {'seq': seq, 'records': records}
+
+    def iter_all(self, filters: Optional[dict] = None,
+                 batch_size: int = 10000) -> Iterator[tuple]:
+        clauses, params = build_filter(filters)
+        cursor = self.conn.execute(
+            f"{RECORD_SQL}{where_sql(clauses)} ORDER BY id", params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+    def get_many(self, coffee_ids: list[int],
+                 filters: Optional[dict] = None) -> list[tuple[int, Optional[CoffeeRecord]]]:
+        clauses, params = build_filter(filters)
+        clauses.append(f"id IN ({', '.join('?' * len(coffee_ids))})")
+        params.extend(coffee_ids)
+        found = {record.id: record
+                 for record in self.query(f"{RECORD_SQL}{where_sql(clauses)}", params)}
+        return [(coffee_id, found.get(coffee_id)) for coffee_id in coffee_ids]
+
+    def insert(self, data: dict) -> CoffeeRecord:
+        values = coffee_values(data)
+        with self.conn:
+            cursor = self.conn.execute(INSERT_SQL, values)
+            self.prune_changes()
+        return CoffeeRecord(cursor.lastrowid, *values)
+
+    def update(self, coffee_id: int, data: dict) -> Optional[CoffeeRecord]:
+        # None when the row is gone, e.g. deleted from another instance.
+        values = coffee_values(data)
+        with self.conn:
+            cursor = self.conn.execute(UPDATE_SQL, values + (coffee_id,))
+            self.prune_changes()
+        return CoffeeRecord(coffee_id, *values) if cursor.rowcount else None
+
+    def delete(self, coffee_id: int) -> Optional[int]:
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM coffee WHERE id = ?", (coffee_id,))
+            self.prune_changes()
+        return coffee_id if cursor.rowcount else None
+
+    def insert_many(self, rows: list[tuple]) -> int:
+        # One transaction per batch. The per-row FTS, change-log and history
+        # triggers are several times slower than handling the whole batch at once, so
+        # they are swapped out inside the transaction and other connections
+        # never see the table without them.
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute("DROP TRIGGER IF EXISTS coffee_fts_insert")
+            self.conn.execute("DROP TRIGGER IF EXISTS coffee_changes_insert")
+            self.conn.execute("DROP TRIGGER IF EXISTS coffee_history_insert")
+            last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM coffee").fetchone()[0]
+            self.conn.executemany(INSERT_SQL, rows)
+            self.conn.execute('''
+            INSERT INTO coffee_fts(rowid, name, description)
+            SELECT id, name, description FROM coffee WHERE id > ?
+            ''', (last_id,))
+            self.conn.execute('''
+            INSERT INTO coffee_changes(coffee_id, op)
+            SELECT id, 'I' FROM coffee WHERE id > ? ORDER BY id
+            ''', (last_id,))
+            self.conn.execute(f'''
+            INSERT INTO price_history(coffee_id, changed_at, price, volume)
+            SELECT id, {NOW_SQL}, price, volume FROM coffee WHERE id > ?
+            ''', (last_id,))
+            self.conn.execute(FTS_INSERT_TRIGGER)
+            self.conn.execute(CHANGE_INSERT_TRIGGER)
+            self.conn.execute(HISTORY_INSERT_TRIGGER)
+            self.prune_changes()
+        return len(rows)
+
+    def delete_many(self, coffee_ids: list[int]) -> list[int]:
+        # Only the ids that were actually deleted, in the order given.
+        deleted = set()
+        with self.conn:
+            for start in range(0, len(coffee_ids), READ_BACK_CHUNK):
+                chunk = coffee_ids[start:start + READ_BACK_CHUNK]
+                deleted.update(coffee_id for coffee_id, in self.conn.execute(
+                    f"DELETE FROM coffee WHERE id IN ({', '.join('?' * len(chunk))}) RETURNING id",
+                    chunk))
+            self.prune_changes()
+        return [coffee_id for coffee_id in dict.fromkeys(coffee_ids) if coffee_id in deleted]
+
+    def data_version(self) -> int:
+        # Moves whenever another connection commits. Answered from the WAL
+        # index and the page cache, so it costs far less than a query.
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def last_change(self) -> int:
+        return self.conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM coffee_changes").fetchone()[0]
+
+    def changes_since(self, seq: int, filters: Optional[dict] = None,
+                      limit: int = CHANGE_LIMIT) -> dict:
+        # Rows touched after seq, read back through the filters: a record of
+        # None means the row is gone or no longer matches. 'reset' asks the
+        # caller to reload instead, when the log no longer reaches back to
+        # seq (pruned, or the file was replaced) or the delta is too large.
+        with self.conn:
+            self.conn.execute("BEGIN")
+            first, last = self.conn.execute(
+                "SELECT MIN(seq), MAX(seq) FROM coffee_changes").fetchone()
+            if last is None or last == seq:
+                return {'seq': seq, 'reset': last is None and seq != 0, 'records': []}
+            if seq > last or seq < first - 1:
+                return {'seq': last, 'reset': True, 'records': []}
+            coffee_ids = [coffee_id for coffee_id, in self.conn.execute(
+                "SELECT DISTINCT coffee_id FROM coffee_changes WHERE seq > ? LIMIT ?",
+                (seq, limit + 1))]
+            if len(coffee_ids) > limit:
+                return {'seq': last, 'reset': True, 'records': []}
+            return {'seq': last, 'reset': False, 'records': self.get_many(coffee_ids, filters)}
+
+    def changes_after_commit(self, seq: int, filters: Optional[dict],
+                             version: Optional[int]) -> dict:
+        # The polling form of changes_since: version is what data_version
+        # returned on this same connection last time (the values of two
+        # connections cannot be compared). While nothing has committed the
+        # poll ends at that PRAGMA, without touching the change log.
+        current = self.data_version()
+        if current == version:
+            delta = {'seq': seq, 'reset': False, 'records': []}
+        else:
+            delta = self.changes_since(seq, filters)
+        delta['version'] = current
+        return delta
+
+    def prune_changes(self, keep: int = CHANGE_LOG_KEEP) -> None:
+        # Run in every write transaction, so the log stays bounded however
+        # long an instance runs; usually it drops the one row that fell out.
+        # Instances that fell further behind than this reload instead.
+        self.conn.execute('''
+        DELETE FROM coffee_changes
+        WHERE seq <= (SELECT MAX(seq) FROM coffee_changes) - ?
+        ''', (keep,))
+
+    def price_as_of(self, coffee_id: int, at: float) -> Optional[dict]:
+        row = self.conn.execute('''
+            SELECT changed_at, price, volume FROM price_history
+            WHERE coffee_id = ? AND changed_at <= ?
+            ORDER BY changed_at DESC, id DESC LIMIT 1
+        ''', (coffee_id, at)).fetchone()
+        if row is None:
+            return None
+        return {'coffee_id': coffee_id, 'changed_at': row[0], 'price': row[1], 'volume': row[2]}
+
+    def price_changes(self, coffee_id: Optional[int] = None, start: Optional[float] = None,
+                      end: Optional[float] = None, limit: Optional[int] = None) -> list[dict]:
+        # Oldest first. One coffee is a range of idx_price_history_coffee;
+        # without coffee_id the whole catalog is read by idx_price_history_time.
+        clauses, params = [], []
+        if coffee_id is not None:
+            clauses.append("coffee_id = ?")
+            params.append(coffee_id)
+        if start is not None:
+            clauses.append("changed_at >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("changed_at <= ?")
+            params.append(end)
+        sql = (f"SELECT coffee_id, changed_at, price, volume FROM price_history"
+               f"{where_sql(clauses)} ORDER BY changed_at, id")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [{'coffee_id': row[0], 'changed_at': row[1], 'price': row[2], 'volume': row[3]}
+                for row in self.conn.execute(sql, params)]
+
+    def update_many(self, coffee_ids: list[int], changes: dict) -> list[CoffeeRecord]:
+        # The same assignment for every id, one executemany in one
+        # transaction; the updated rows are read back before it commits.
+        error = validate_changes(changes)
+        if error:
+            raise ValueError(error)
+        values = change_values(changes)
+        assignments = ', '.join(
+            f"{LOOKUP_COLUMNS[field][0]} = {LOOKUP_COLUMNS[field][1]}" if field in LOOKUP_COLUMNS
+            else f"{field} = ?" for field in values)
+        params = tuple(values.values())
+        records = []
+        with self.conn:
+            self.conn.executemany(f"UPDATE coffee SET {assignments} WHERE id = ?",
+                                  [params + (coffee_id,) for coffee_id in coffee_ids])
+            self.prune_changes()
+            for start in range(0, len(coffee_ids), READ_BACK_CHUNK):
+                records.extend(record for _, record in
+                               self.get_many(coffee_ids[start:start + READ_BACK_CHUNK])
+                               if record is not None)
+        return records
+
+    def update_statistics(self) -> None:
+        update_statistics(self.conn)
+
+
+def get_repository() -> CatalogRepository:
+    return CatalogRepository(get_connection())
@@ -0,0 +1,30 @@
+from catalog.migrations import migrate
+
+SAMPLE_DATA = [
+    ('Эфиопия Иргачефф', 'Средняя', 'Зерна', 'Цветочные и цитрусовые ноты с яркой кислотностью', 1250.0, 250.0),
+    ('Колумбия Супремо', 'Темная', 'Молотый', 'Шоколадный вкус с ореховыми нотами', 980.0, 250.0),
+    ('Кения АА', 'Светлая', 'Зерна', 'Ягодные тона с винным послевкусием', 1450.0, 200.0),
+    ('Бразилия Сантос', 'Средняя', 'Молотый', 'Ореховый вкус с сладким карамельным послевкусием', 850.0, 500.0),
+    ('Гватемала Антивей', 'Темная', 'Зерна', 'Дымный аромат с пряными нотами', 1100.0, 300.0),
+    ('Эспрессо Бленд', 'Темная', 'Молотый', 'Сбалансированный вкус для эспрессо', 920.0, 400.0),
+    ('Коста Рика Тарразу', 'Средняя', 'Зерна', 'Яркий вкус с нотками карамели и орехов', 1350.0, 250.0)
+]
+
+
+def ensure_schema(conn):
+    # Brings the file up to the current schema version; a rebuilt table has
+    # no statistics yet, so gather them straight away.
+    if migrate(conn):
+        update_statistics(conn, refresh=True)
+
+
+def update_statistics(conn, refresh=False):
+    # Filters and sorts can each be served by several indexes; without
+    # statistics the planner tends to pick one that needs a full sort.
+    conn.execute("PRAGMA analysis_limit=1000")
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+    if has_stats is None or refresh:
+        conn.execute("ANALYZE")
+    else:
+        conn.execute("PRAGMA optimize")
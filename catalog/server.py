@@ -0,0 +1,437 @@
+import argparse
+import asyncio
+import base64
+import binascii
+import json
+import math
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl, unquote
+
+from catalog import analytics
+from catalog.bulk import clean_record, read_item, import_records
+from catalog.db import set_database_path
+from catalog.query import SORTABLE_FIELDS
+from catalog.repository import CatalogRepository, get_repository
+from catalog.validation import validate_coffee
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+READERS = min(8, os.cpu_count() or 1)
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MAX_BULK_IDS = 10000
+MAX_BODY = 16 * 1024 * 1024
+MAX_HEADERS = 100
+KEEP_ALIVE_TIMEOUT = 30
+TEXT_FILTERS = ('search', 'roast_degree', 'type')
+NUMBER_FILTERS = ('price_min', 'price_max', 'volume_min', 'volume_max')
+
+
+class HttpError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def encode_cursor(record, sort_field):
+    key = [getattr(record, sort_field), record.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+
+def decode_cursor(text):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(text + '=' * (-len(text) % 4)))
+    except (binascii.Error, ValueError):
+        key = None
+    if not (isinstance(key, list) and len(key) == 2 and type(key[1]) is int
+            and isinstance(key[0], (str, int, float)) and not isinstance(key[0], bool)):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Некорректный курсор")
+    return tuple(key)
+
+
+def parse_list_query(query):
+    params = dict(parse_qsl(query))
+    filters = {key: params[key] for key in TEXT_FILTERS if params.get(key)}
+    try:
+        for key in NUMBER_FILTERS:
+            if params.get(key):
+                filters[key] = float(params[key])
+        limit = int(params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Некорректное число в запросе") from None
+    sort_field = params.get('sort', 'id')
+    if sort_field not in SORTABLE_FIELDS:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Нельзя сортировать по полю {sort_field}")
+    order = params.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "order должен быть asc или desc")
+    after = decode_cursor(params['after']) if params.get('after') else None
+    return filters, sort_field, order == 'desc', after, max(1, min(limit, MAX_LIMIT))
+
+
+def parse_time(text):
+    # Unix seconds or ISO 8601; times without a zone are taken as UTC.
+    try:
+        value = float(text)
+    except ValueError:
+        try:
+            moment = datetime.fromisoformat(text)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Некорректное время: {text}") from None
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.timestamp()
+    if not math.isfinite(value):
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Некорректное время: {text}")
+    return value
+
+
+def format_change(change):
+    moment = datetime.fromtimestamp(change['changed_at'], timezone.utc)
+    return {**change, 'changed_at': moment.isoformat()}
+
+
+def parse_history_query(query):
+    params = dict(parse_qsl(query))
+    start = parse_time(params['from']) if params.get('from') else None
+    end = parse_time(params['to']) if params.get('to') else None
+    try:
+        limit = int(params.get('limit', MAX_LIMIT))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Некорректное число в запросе") from None
+    return start, end, max(1, min(limit, MAX_LIMIT))
+
+
+def parse_record(data):
+    if not isinstance(data, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Ожидается JSON-объект")
+    record = clean_record(data)
+    # The same rules as the edit dialog, so both front ends accept the same data.
+    error = validate_coffee(record)
+    if error:
+        raise HttpError(HTTPStatus.UNPROCESSABLE_ENTITY, error)
+    return record
+
+
+def parse_ids(data):
+    ids = data.get('ids') if isinstance(data, dict) else None
+    if not (isinstance(ids, list) and ids and all(type(i) is int for i in ids)):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Ожидается непустой список ids")
+    if len(ids) > MAX_BULK_IDS:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                        f"Не больше {MAX_BULK_IDS} записей за запрос")
+    return list(dict.fromkeys(ids))
+
+
+def etag_matches(header, etag):
+    if header is None:
+        return False
+    candidates = [tag.strip() for tag in header.split(',')]
+    return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+# The functions below run on the pool threads, each with its own connection,
+# and take the repository first like the GUI's DbTask functions.
+
+def read_fresh(repository, if_none_match, func, *args):
+    # The change-log position is the ETag: it moves on every committed write,
+    # so when it still matches the client's copy no query is run at all.
+    with repository.conn:
+        repository.conn.execute("BEGIN")
+        etag = f'"{repository.last_change()}"'
+        if etag_matches(if_none_match, etag):
+            return etag, False, None
+        return etag, True, func(repository, *args)
+
+
+def create_records(repository, items):
+    # Bad items are counted as rejected, as in a file import; the rest are stored.
+    return import_records(repository, (read_item(item) for item in items))
+
+
+def run_task(func, args):
+    return func(get_repository(), *args)
+
+
+class CatalogServer:
+    def __init__(self, readers=READERS):
+        self.readers = ThreadPoolExecutor(readers, thread_name_prefix='catalog-read')
+        # Writes go through a single thread, as in the GUI, so they reach
+        # SQLite in arrival order and never wait on each other for the lock.
+        self.writer = ThreadPoolExecutor(1, thread_name_prefix='catalog-write')
+
+    async def read(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.readers, run_task, func, args)
+
+    async def write(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.writer, run_task, func, args)
+
+    def close(self):
+        self.readers.shutdown()
+        self.writer.shutdown()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if ready is not None:
+            ready(server)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except HttpError as e:
+                    writer.write(render_response(e.status, {'error': str(e)}, e.headers, False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                status, payload, headers = await self.dispatch(request)
+                writer.write(render_response(status, payload, headers, request['keep_alive']))
+                await writer.drain()
+                if not request['keep_alive']:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request):
+        try:
+            return await self.route(request)
+        except HttpError as e:
+            if e.status == HTTPStatus.NOT_MODIFIED:
+                return e.status, None, e.headers
+            return e.status, {'error': str(e)}, e.headers
+        except ValueError as e:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {'error': str(e)}, {}
+        except sqlite3.IntegrityError as e:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {'error': str(e)}, {}
+        except sqlite3.Error as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': f"Ошибка базы данных: {e}"}, {}
+
+    async def route(self, request):
+        method = request['method']
+        parts = [part for part in request['path'].split('/') if part]
+        if parts == ['coffee']:
+            handlers = {'GET': self.list_coffee, 'POST': self.create_coffee}
+        elif parts == ['coffee', 'bulk']:
+            handlers = {'POST': self.bulk_create, 'PATCH': self.bulk_update,
+                        'DELETE': self.bulk_delete}
+        elif parts == ['analytics']:
+            handlers = {'GET': self.get_analytics}
+        elif parts == ['history']:
+            handlers = {'GET': self.list_history}
+        elif len(parts) == 2 and parts[0] == 'coffee' and parts[1].isdecimal():
+            handlers = {'GET': self.get_coffee, 'PUT': self.update_coffee,
+                        'DELETE': self.delete_coffee}
+            request['id'] = int(parts[1])
+        elif len(parts) == 3 and parts[0] == 'coffee' and parts[1].isdecimal() and \
+                parts[2] in ('history', 'price'):
+            handlers = {'GET': self.coffee_history if parts[2] == 'history' else self.price_as_of}
+            request['id'] = int(parts[1])
+        else:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Ресурс не найден")
+        handler = handlers.get(method)
+        if handler is None:
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, "Метод не поддерживается",
+                            {'Allow': ', '.join(handlers)})
+        return await handler(request)
+
+    async def read_fresh(self, request, func, *args):
+        etag, modified, result = await self.read(
+            read_fresh, request['headers'].get('if-none-match'), func, *args)
+        if not modified:
+            raise HttpError(HTTPStatus.NOT_MODIFIED, '', {'ETag': etag})
+        return etag, result
+
+    async def list_coffee(self, request):
+        filters, sort_field, descending, after, limit = parse_list_query(request['query'])
+        etag, page = await self.read_fresh(request, CatalogRepository.page,
+                                           filters, sort_field, descending, after, limit)
+        cursor = encode_cursor(page[-1], sort_field) if len(page) == limit else None
+        return (HTTPStatus.OK,
+                {'items': [record.as_dict() for record in page], 'next': cursor},
+                {'ETag': etag})
+
+    async def get_coffee(self, request):
+        etag, record = await self.read_fresh(request, CatalogRepository.get, request['id'])
+        if record is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Запись не найдена")
+        return HTTPStatus.OK, record.as_dict(), {'ETag': etag}
+
+    async def get_analytics(self, request):
+        # Cached per process until the change log moves; the position it was
+        # computed at doubles as the ETag.
+        summary = await self.read(analytics.summary)
+        etag = f'"{summary["seq"]}"'
+        if etag_matches(request['headers'].get('if-none-match'), etag):
+            return HTTPStatus.NOT_MODIFIED, None, {'ETag': etag}
+        return HTTPStatus.OK, summary, {'ETag': etag}
+
+    async def coffee_history(self, request):
+        start, end, limit = parse_history_query(request['query'])
+        etag, changes = await self.read_fresh(request, CatalogRepository.price_changes,
+                                              request['id'], start, end, limit)
+        return HTTPStatus.OK, {'items': [format_change(change) for change in changes]}, {'ETag': etag}
+
+    async def price_as_of(self, request):
+        params = dict(parse_qsl(request['query']))
+        if not params.get('at'):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Нужен параметр at")
+        etag, change = await self.read_fresh(request, CatalogRepository.price_as_of,
+                                             request['id'], parse_time(params['at']))
+        if change is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Нет цены на эту дату")
+        return HTTPStatus.OK, format_change(change), {'ETag': etag}
+
+    async def list_history(self, request):
+        start, end, limit = parse_history_query(request['query'])
+        etag, changes = await self.read_fresh(request, CatalogRepository.price_changes,
+                                              None, start, end, limit)
+        return HTTPStatus.OK, {'items': [format_change(change) for change in changes]}, {'ETag': etag}
+
+    async def create_coffee(self, request):
+        record = await self.write(CatalogRepository.insert, parse_record(request_json(request)))
+        return HTTPStatus.CREATED, record.as_dict(), {'Location': f"/coffee/{record.id}"}
+
+    async def update_coffee(self, request):
+        record = await self.write(CatalogRepository.update, request['id'],
+                                  parse_record(request_json(request)))
+        if record is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Запись не найдена")
+        return HTTPStatus.OK, record.as_dict(), {}
+
+    async def delete_coffee(self, request):
+        if await self.write(CatalogRepository.delete, request['id']) is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Запись не найдена")
+        return HTTPStatus.NO_CONTENT, None, {}
+
+    async def bulk_create(self, request):
+        items = request_json(request)
+        if not (isinstance(items, list) and all(isinstance(item, dict) for item in items)):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Ожидается JSON-массив объектов")
+        result = await self.write(create_records, items)
+        return HTTPStatus.OK, result, {}
+
+    async def bulk_update(self, request):
+        data = request_json(request)
+        ids = parse_ids(data)
+        changes = data.get('changes')
+        if not isinstance(changes, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Ожидается объект changes")
+        records = await self.write(CatalogRepository.update_many, ids, changes)
+        return HTTPStatus.OK, {'items': [record.as_dict() for record in records]}, {}
+
+    async def bulk_delete(self, request):
+        ids = parse_ids(request_json(request))
+        deleted = await self.write(CatalogRepository.delete_many, ids)
+        return HTTPStatus.OK, {'deleted': deleted}, {}
+
+
+def request_json(request):
+    try:
+        return json.loads(request['body'])
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Некорректный JSON") from None
+
+
+async def read_line(reader, status, message):
+    # StreamReader refuses a line longer than its buffer limit (64 KiB) with
+    # a ValueError; the client still gets an answer before the connection
+    # is closed.
+    try:
+        return await reader.readline()
+    except ValueError:
+        raise HttpError(status, message) from None
+
+
+async def read_request(reader):
+    line = await read_line(reader, HTTPStatus.BAD_REQUEST, "Слишком длинная строка запроса")
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Некорректная строка запроса") from None
+    headers = {}
+    while True:
+        line = await read_line(reader, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                               "Слишком длинный заголовок")
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Слишком много заголовков")
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if 'transfer-encoding' in headers:
+        raise HttpError(HTTPStatus.LENGTH_REQUIRED, "Нужен заголовок Content-Length")
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Некорректный Content-Length") from None
+    if length > MAX_BODY:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Слишком большой запрос")
+    body = await reader.readexactly(length) if length > 0 else b''
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    url = urlsplit(target)
+    return {'method': method.upper(), 'path': unquote(url.path), 'query': url.query,
+            'headers': headers, 'body': body, 'keep_alive': keep_alive}
+
+
+def render_response(status, payload, headers, keep_alive):
+    status = HTTPStatus(status)
+    body = b''
+    if payload is not None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    if payload is not None:
+        lines.append("Content-Type: application/json; charset=utf-8")
+    if status != HTTPStatus.NOT_MODIFIED:
+        lines.append(f"Content-Length: {len(body)}")
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m catalog.server",
+                                     description="HTTP/JSON API каталога кофе")
+    parser.add_argument('--database', help="путь к coffee.sqlite")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--readers', type=int, default=READERS,
+                        help="число потоков чтения")
+    args = parser.parse_args(argv)
+
+    if args.database:
+        set_database_path(args.database)
+    repository = CatalogRepository.open()
+    try:
+        repository.prepare(seed=False)
+    finally:
+        repository.close()
+
+    server = CatalogServer(args.readers)
+    ready = lambda s: print(f"Сервер запущен на http://{args.host}:{args.port}/coffee",
+                            file=sys.stderr, flush=True)
+    try:
+        asyncio.run(server.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
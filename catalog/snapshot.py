@@ -0,0 +1,221 @@
+import argparse
+import gzip
+import os
+import sqlite3
+import sys
+import zlib
+from datetime import datetime
+
+from catalog.db import get_database_path
+from catalog.migrations import SCHEMA_VERSION, database_file, schema_version
+from catalog.repository import CatalogRepository
+from catalog.schema import ensure_schema
+
+SUFFIX = '.sqlite.gz'
+# How many snapshots a directory keeps; creating one more drops the oldest.
+KEEP = 10
+# Pages copied per backup step (4 MB at the default page size). Between
+# steps the source is unlocked and the progress callback runs.
+PAGES_PER_STEP = 1024
+COPY_BUFFER = 1024 * 1024
+COMPRESS_LEVEL = 6
+# How far past the live change log a restored file starts numbering. Commits
+# made by other processes while the restore waits for the write lock are
+# overwritten, and their seq numbers must still fall behind the marker.
+RESTORE_SEQ_GAP = 1000
+
+
+def snapshot_dir(db_path=None):
+    db_path = db_path or get_database_path()
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), 'snapshots')
+
+
+def list_snapshots(directory):
+    # Newest first; the timestamp in the name sorts the same way.
+    if not os.path.isdir(directory):
+        return []
+    names = sorted((name for name in os.listdir(directory) if name.endswith(SUFFIX)),
+                   reverse=True)
+    return [os.path.join(directory, name) for name in names]
+
+
+def rotate(directory, keep=KEEP):
+    removed = []
+    for path in list_snapshots(directory)[keep:]:
+        os.remove(path)
+        removed.append(path)
+    return removed
+
+
+def remove_database(path):
+    for name in (path, f"{path}-wal", f"{path}-shm", f"{path}-journal"):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+def copy_file(source, target, position, size, progress, start, span):
+    while True:
+        block = source.read(COPY_BUFFER)
+        if not block:
+            return
+        target.write(block)
+        if progress is not None and size:
+            progress(start + min(position() * span // size, span))
+
+
+def backup_steps(source, target, progress, start, span):
+    def step(status, remaining, total):
+        if progress is not None and total:
+            progress(start + (total - remaining) * span // total)
+    source.backup(target, pages=PAGES_PER_STEP, progress=step)
+
+
+def create_snapshot(repository, directory=None, keep=KEEP, progress=None):
+    # Copies the live file with the online backup API, then compresses it.
+    # progress gets a percentage: the copy is the first half, gzip the second.
+    if keep < 1:
+        raise ValueError("Нужно хранить хотя бы один снимок")
+    conn = repository.conn
+    db_path = database_file(conn)
+    if db_path is None:
+        raise ValueError("Снимок можно сделать только с базы данных в файле")
+    directory = directory or snapshot_dir(db_path)
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    name = f"{stem}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+    path = os.path.join(directory, name + SUFFIX)
+    copy_path = os.path.join(directory, f".{name}.sqlite")
+    partial_path = path + '.part'
+
+    try:
+        target = sqlite3.connect(copy_path)
+        try:
+            # A read transaction pins one snapshot of the file for the whole
+            # copy. Without it every commit from another connection makes the
+            # backup start over, and a busy catalog might never finish.
+            # Readers and the writer carry on as usual under WAL.
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+                backup_steps(conn, target, progress, 0, 50)
+            target.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            target.close()
+
+        with open(copy_path, 'rb') as source, \
+                gzip.open(partial_path, 'wb', compresslevel=COMPRESS_LEVEL) as compressed:
+            copy_file(source, compressed, source.tell, os.path.getsize(copy_path),
+                      progress, 50, 50)
+        # The finished name only ever points at a complete archive.
+        os.replace(partial_path, path)
+    finally:
+        remove_database(copy_path)
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    rotate(directory, keep)
+    return path
+
+
+def restore_snapshot(repository, path, progress=None):
+    # Unpacks the snapshot next to the live file, checks and upgrades it
+    # there, and then copies it over the live database in one write
+    # transaction: other connections see either the old catalog or the
+    # restored one, never a mix. Returns the change-log seq after restoring.
+    conn = repository.conn
+    db_path = database_file(conn)
+    if db_path is None:
+        raise ValueError("Восстановить можно только базу данных в файле")
+    restore_path = f"{db_path}.restore"
+    remove_database(restore_path)
+
+    try:
+        with open(path, 'rb') as raw, gzip.GzipFile(fileobj=raw) as compressed, \
+                open(restore_path, 'wb') as target:
+            copy_file(compressed, target, raw.tell, os.path.getsize(path), progress, 0, 40)
+
+        source = sqlite3.connect(restore_path, isolation_level=None)
+        try:
+            prepare_restored(source, conn)
+            if progress is not None:
+                progress(50)
+            backup_steps(source, conn, progress, 50, 50)
+        finally:
+            source.close()
+    except (gzip.BadGzipFile, EOFError, zlib.error) as e:
+        raise ValueError(f"Файл снимка поврежден: {e}") from e
+    finally:
+        remove_database(restore_path)
+        for version in range(SCHEMA_VERSION):
+            # Upgrading keeps a copy of the file as it was; not needed here.
+            remove_database(f"{restore_path}.v{version}.bak")
+    return repository.last_change()
+
+
+def prepare_restored(source, conn):
+    try:
+        check = source.execute("PRAGMA quick_check").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"Снимок не является базой данных каталога: {e}") from e
+    if check != 'ok':
+        raise ValueError(f"Снимок поврежден: {check}")
+    if schema_version(source) > SCHEMA_VERSION:
+        raise ValueError(f"Снимок создан более новой версией программы "
+                         f"(схема {schema_version(source)})")
+    ensure_schema(source)
+
+    # seq numbers are versions and ETags, so they must keep growing across
+    # a restore. The snapshot's log describes edits other instances may not
+    # have seen in this order; it is replaced by one marker far enough past
+    # the live log that every instance reloads instead of asking for a delta.
+    last = CatalogRepository(conn).last_change()
+    source.execute("BEGIN IMMEDIATE")
+    source.execute("DELETE FROM coffee_changes")
+    source.execute("INSERT INTO coffee_changes(seq, coffee_id, op) VALUES (?, 0, 'D')",
+                   (last + RESTORE_SEQ_GAP,))
+    source.execute("COMMIT")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m catalog.snapshot",
+                                     description="Снимки базы данных каталога кофе")
+    parser.add_argument('command', choices=['create', 'list', 'restore'])
+    parser.add_argument('path', nargs='?', help="файл снимка для restore")
+    parser.add_argument('--database', help="путь к coffee.sqlite")
+    parser.add_argument('--dir', help="каталог со снимками")
+    parser.add_argument('--keep', type=int, default=KEEP)
+    args = parser.parse_args(argv)
+
+    directory = args.dir or snapshot_dir(args.database)
+    if args.command == 'list':
+        for path in list_snapshots(directory):
+            print(f"{path}\t{os.path.getsize(path)}")
+        return 0
+    if args.command == 'restore' and not args.path:
+        parser.error("укажите файл снимка")
+    if args.keep < 1:
+        parser.error("--keep должен быть не меньше 1")
+
+    report = lambda percent: print(f"\r{percent}%", end='', file=sys.stderr, flush=True)
+    repository = CatalogRepository.open(args.database)
+    try:
+        repository.prepare(seed=False)
+        if args.command == 'create':
+            path = create_snapshot(repository, directory, args.keep, report)
+            print(file=sys.stderr)
+            print(f"Снимок: {path}")
+            return 0
+        try:
+            restore_snapshot(repository, args.path, report)
+        except ValueError as e:
+            print(file=sys.stderr)
+            print(f"Ошибка: {e}", file=sys.stderr)
+            return 1
+        print(file=sys.stderr)
+        print(f"Восстановлено из {args.path}")
+        return 0
+    finally:
+        repository.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
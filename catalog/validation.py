@@ -0,0 +1,60 @@
+import math
+
+ROAST_DEGREES = ('Светлая', 'Средняя', 'Темная')
+COFFEE_TYPES = ('Зерна', 'Молотый')
+BULK_FIELDS = ('roast_degree', 'type', 'price', 'volume')
+
+
+def parse_positive(value):
+    try:
+        number = float(str(value).replace(',', '.'))
+    except ValueError:
+        return None
+    if not (number > 0 and math.isfinite(number)):
+        return None
+    return number
+
+
+def validate_coffee(data):
+    for field in ('name', 'description'):
+        if data.get(field) is not None and not isinstance(data[field], str):
+            return f"Поле {field} должно быть строкой"
+    if not data.get('name'):
+        return "Введите название кофе"
+    if data.get('roast_degree') not in ROAST_DEGREES:
+        return "Выберите степень обжарки"
+    if data.get('type') not in COFFEE_TYPES:
+        return "Выберите тип кофе"
+    if not data.get('price') or parse_positive(data['price']) is None:
+        return "Введите корректную цену"
+    if not data.get('volume') or parse_positive(data['volume']) is None:
+        return "Введите корректный объем"
+    return None
+
+
+def coffee_values(data):
+    return (data['name'], data['roast_degree'], data['type'],
+            data.get('description') or '', parse_positive(data['price']),
+            parse_positive(data['volume']))
+
+
+def validate_changes(changes):
+    if not changes:
+        return "Выберите хотя бы одно поле"
+    for field, value in changes.items():
+        if field not in BULK_FIELDS:
+            return f"Поле {field} нельзя изменить для нескольких записей"
+        if field == 'roast_degree' and value not in ROAST_DEGREES:
+            return "Выберите степень обжарки"
+        if field == 'type' and value not in COFFEE_TYPES:
+            return "Выберите тип кофе"
+        if field == 'price' and parse_positive(value) is None:
+            return "Введите корректную цену"
+        if field == 'volume' and parse_positive(value) is None:
+            return "Введите корректный объем"
+    return None
+
+
+def change_values(changes):
+    return {field: parse_positive(value) if field in ('price', 'volume') else value
+            for field, value in changes.items()}
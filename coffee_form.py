@@ -0,0 +1,220 @@
+import time
+
+from PyQt6.QtWidgets import (QDialog, QMessageBox, QFormLayout, QVBoxLayout, QHBoxLayout,
+                             QCheckBox, QComboBox, QLineEdit, QPushButton, QGroupBox,
+                             QDateEdit, QLabel)
+from PyQt6.QtGui import QDoubleValidator
+from PyQt6.QtCore import QDate, QDateTime, QTime
+
+from UI.addEditCoffeeForm import Ui_Dialog
+import metrics
+from catalog import (CatalogRepository, ROAST_DEGREES, COFFEE_TYPES, validate_coffee,
+                     validate_changes)
+from workers import run_read
+from price_chart import PriceChart, price_at
+
+HISTORY_DAYS = 90
+
+
+class AddEditCoffeeForm(QDialog, Ui_Dialog):
+    def __init__(self, parent=None, coffee_id=None, record=None):
+        super().__init__(parent)
+        self.setupUi(self)
+        self.coffee_id = coffee_id
+        self.task = None
+        self.history_task = None
+        self.setup_validators()
+        
+        if self.coffee_id:
+            self.setup_history()
+            # A record from the model's cache fills the form without a query.
+            if record is not None:
+                self.fill_fields(record)
+            else:
+                self.load_coffee_data()
+            self.setWindowTitle("Редактирование кофе")
+        else:
+            self.setWindowTitle("Добавление нового кофе")
+            
+        self.cancelButton.clicked.connect(self.reject)
+        self.saveButton.clicked.connect(self.accept)
+        
+    def setup_validators(self):
+        price_validator = QDoubleValidator()
+        price_validator.setBottom(0)
+        self.priceEdit.setValidator(price_validator)
+        
+        volume_validator = QDoubleValidator()
+        volume_validator.setBottom(0)
+        self.volumeEdit.setValidator(volume_validator)
+            
+    def setup_history(self):
+        # Editing only: the price history of this coffee, drawn for a date
+        # range, with the price in force on the range's last day.
+        self.historyBox = QGroupBox("История цены", self)
+        self.chart = PriceChart(self.historyBox)
+        today = QDate.currentDate()
+        self.fromEdit = QDateEdit(today.addDays(-HISTORY_DAYS), self.historyBox)
+        self.toEdit = QDateEdit(today, self.historyBox)
+        for edit in (self.fromEdit, self.toEdit):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat('dd.MM.yyyy')
+            edit.dateChanged.connect(self.update_history_range)
+        self.historyLabel = QLabel(self.historyBox)
+
+        dates = QHBoxLayout()
+        dates.addWidget(QLabel("С", self.historyBox))
+        dates.addWidget(self.fromEdit)
+        dates.addWidget(QLabel("по", self.historyBox))
+        dates.addWidget(self.toEdit)
+        dates.addStretch()
+        layout = QVBoxLayout(self.historyBox)
+        layout.addLayout(dates)
+        layout.addWidget(self.chart)
+        layout.addWidget(self.historyLabel)
+        self.verticalLayout.insertWidget(1, self.historyBox)
+        self.resize(self.width(), self.height() + 260)
+
+        self.changes = []
+        self.times = []
+        self.history_task = run_read(CatalogRepository.price_changes, self.coffee_id,
+                                     on_finished=self.on_history_loaded,
+                                     on_failed=self.on_history_failed)
+
+    def on_history_loaded(self, changes):
+        self.history_task = None
+        self.changes = changes
+        self.times = [change['changed_at'] for change in changes]
+        self.chart.set_changes(changes)
+        self.update_history_range()
+
+    def on_history_failed(self, error):
+        self.history_task = None
+        self.historyLabel.setText(f"История недоступна: {error}")
+
+    def update_history_range(self):
+        start = QDateTime(self.fromEdit.date(), QTime(0, 0)).toSecsSinceEpoch()
+        end = min(QDateTime(self.toEdit.date(), QTime(23, 59, 59)).toSecsSinceEpoch(), time.time())
+        if end < start:
+            start = end
+        self.chart.set_range(start, end)
+        if self.history_task is not None:
+            self.historyLabel.setText("Загрузка истории...")
+            return
+        current = price_at(self.changes, self.times, end)
+        changed = sum(1 for moment in self.times if start <= moment <= end)
+        date = self.toEdit.date().toString('dd.MM.yyyy')
+        if current is None:
+            self.historyLabel.setText(f"На {date} цены еще не было")
+        else:
+            self.historyLabel.setText(
+                f"Цена на {date}: {current['price']:.2f} руб. за {current['volume']:g} г, "
+                f"изменений за период: {changed}")
+
+    def load_coffee_data(self):
+        self.saveButton.setEnabled(False)
+        on_loaded = metrics.timed('ui.load_coffee_data', self.on_coffee_loaded)
+        self.task = run_read(CatalogRepository.get, self.coffee_id,
+                             on_finished=on_loaded,
+                             on_failed=self.on_load_failed)
+    
+    def on_coffee_loaded(self, record):
+        self.task = None
+        if record:
+            self.fill_fields(record)
+    
+    def fill_fields(self, record):
+        self.nameEdit.setText(record.name)
+        self.roastCombo.setCurrentText(record.roast_degree)
+        self.typeCombo.setCurrentText(record.type)
+        self.descriptionEdit.setPlainText(record.description or '')
+        self.priceEdit.setText(str(record.price))
+        self.volumeEdit.setText(str(record.volume))
+        self.saveButton.setEnabled(True)
+    
+    def on_load_failed(self, error):
+        self.task = None
+        QMessageBox.critical(self, "Ошибка", f"Ошибка загрузки данных: {error}")
+    
+    def done(self, result):
+        for task in (self.task, self.history_task):
+            if task is not None:
+                task.cancel()
+        self.task = self.history_task = None
+        super().done(result)
+
+    def get_data(self):
+        return {
+            'name': self.nameEdit.text().strip(),
+            'roast_degree': self.roastCombo.currentText(),
+            'type': self.typeCombo.currentText(),
+            'description': self.descriptionEdit.toPlainText().strip(),
+            'price': self.priceEdit.text().strip(),
+            'volume': self.volumeEdit.text().strip()
+        }
+    
+    def validate_data(self, data):
+        error = validate_coffee(data)
+        if error:
+            QMessageBox.warning(self, "Ошибка", error)
+            return False
+        return True
+
+
+class BulkEditForm(QDialog):
+    def __init__(self, parent=None, count=0):
+        super().__init__(parent)
+        self.setWindowTitle(f"Изменение выбранных записей ({count})")
+        self.resize(400, 220)
+
+        self.roastCombo = QComboBox(self)
+        self.roastCombo.addItems(ROAST_DEGREES)
+        self.typeCombo = QComboBox(self)
+        self.typeCombo.addItems(COFFEE_TYPES)
+        self.priceEdit = QLineEdit(self)
+        self.volumeEdit = QLineEdit(self)
+        for edit in (self.priceEdit, self.volumeEdit):
+            validator = QDoubleValidator(edit)
+            validator.setBottom(0)
+            edit.setValidator(validator)
+
+        # Only checked fields are written; the rest keep their current values.
+        self.fields = {
+            'roast_degree': (QCheckBox("Степень обжарки", self), self.roastCombo),
+            'type': (QCheckBox("Молотый/в зернах", self), self.typeCombo),
+            'price': (QCheckBox("Цена (руб)", self), self.priceEdit),
+            'volume': (QCheckBox("Объем упаковки (г)", self), self.volumeEdit),
+        }
+        form = QFormLayout()
+        for check, editor in self.fields.values():
+            editor.setEnabled(False)
+            check.toggled.connect(editor.setEnabled)
+            form.addRow(check, editor)
+
+        self.saveButton = QPushButton("Сохранить", self)
+        self.cancelButton = QPushButton("Отмена", self)
+        self.saveButton.clicked.connect(self.accept)
+        self.cancelButton.clicked.connect(self.reject)
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(self.saveButton)
+        buttons.addWidget(self.cancelButton)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(form)
+        layout.addLayout(buttons)
+
+    def get_changes(self):
+        changes = {}
+        for field, (check, editor) in self.fields.items():
+            if check.isChecked():
+                changes[field] = (editor.currentText() if isinstance(editor, QComboBox)
+                                  else editor.text().strip())
+        return changes
+
+    def validate_changes(self, changes):
+        error = validate_changes(changes)
+        if error:
+            QMessageBox.warning(self, "Ошибка", error)
+            return False
+        return True
@@ -0,0 +1,133 @@
+import json
+import time
+from datetime import datetime, timezone
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QCheckBox, QTableWidget,
+                             QTableWidgetItem, QPushButton, QHeaderView, QFileDialog,
+                             QMessageBox, QApplication)
+from PyQt6.QtCore import Qt, QObject, QEvent, QTimer
+
+import metrics
+
+COLUMNS = ['Метрика', 'Вызовов', 'Среднее (мс)', 'p50 (мс)', 'p95 (мс)', 'Макс (мс)', 'Строк']
+KEYS = ['count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms', 'rows']
+
+
+class PaintTimer(QObject):
+    # Times the table's viewport painting, which is where the model's data()
+    # is called for every visible cell. Only installed while metrics are on.
+    def __init__(self, view, parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.painting = False
+        view.viewport().installEventFilter(self)
+
+    def detach(self):
+        self.view.viewport().removeEventFilter(self)
+        self.setParent(None)
+
+    def eventFilter(self, watched, event):
+        if event.type() != QEvent.Type.Paint or self.painting:
+            return False
+        self.painting = True
+        started = time.perf_counter()
+        try:
+            QApplication.sendEvent(watched, event)
+        finally:
+            self.painting = False
+        first = self.view.rowAt(0)
+        last = self.view.rowAt(watched.height() - 1)
+        if first < 0:
+            rows = 0
+        else:
+            rows = (last if last >= 0 else self.view.model().rowCount() - 1) - first + 1
+        metrics.record('ui.paint_table', time.perf_counter() - started, rows)
+        return True
+
+
+class DiagnosticsDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Диагностика")
+        self.resize(760, 420)
+
+        self.enabledCheck = QCheckBox("Собирать метрики", self)
+        self.enabledCheck.setChecked(metrics.enabled)
+        self.enabledCheck.toggled.connect(self.on_enabled_toggled)
+
+        self.table = QTableWidget(0, len(COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+
+        self.refreshButton = QPushButton("Обновить", self)
+        self.resetButton = QPushButton("Сбросить", self)
+        self.exportButton = QPushButton("Экспорт JSON...", self)
+        self.closeButton = QPushButton("Закрыть", self)
+        self.refreshButton.clicked.connect(self.refresh)
+        self.resetButton.clicked.connect(self.reset)
+        self.exportButton.clicked.connect(self.export_json)
+        self.closeButton.clicked.connect(self.accept)
+
+        buttons = QHBoxLayout()
+        for button in (self.refreshButton, self.resetButton, self.exportButton):
+            buttons.addWidget(button)
+        buttons.addStretch()
+        buttons.addWidget(self.closeButton)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.enabledCheck)
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setInterval(1000)
+        self.refreshTimer.timeout.connect(self.refresh)
+        self.refreshTimer.start()
+        self.refresh()
+
+    def on_enabled_toggled(self, enabled):
+        parent = self.parent()
+        if parent is not None and hasattr(parent, 'set_metrics_enabled'):
+            parent.set_metrics_enabled(enabled)
+        else:
+            metrics.set_enabled(enabled)
+
+    def refresh(self):
+        snapshot = metrics.snapshot()
+        self.table.setRowCount(len(snapshot))
+        for row, (name, values) in enumerate(snapshot.items()):
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            for column, key in enumerate(KEYS, 1):
+                value = values[key]
+                text = '' if value is None else (f"{value:.2f}" if isinstance(value, float) else str(value))
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def reset(self):
+        metrics.reset()
+        self.refresh()
+
+    def export_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Экспорт метрик", "metrics.json", "JSON (*.json)")
+        if not path:
+            return
+        report = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'enabled': metrics.enabled,
+            'buckets_ms': list(metrics.BUCKETS_MS),
+            'metrics': metrics.snapshot(),
+        }
+        try:
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка сохранения: {e}")
+
+    def done(self, result):
+        self.refreshTimer.stop()
+        super().done(result)
@@ -1,13 +1,28 @@
+import startup  # first, so the startup timings include every import below
 import sys
 import os
-import sqlite3
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QTableWidgetItem, 
-                           QHeaderView, QMessageBox, QDialog)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QDoubleValidator
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QHeaderView,
+                           QMessageBox, QDialog, QLabel, QProgressBar,
+                           QFileDialog)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QKeySequence, QShortcut
 
 from UI.main_ui import Ui_MainWindow
-from UI.addEditCoffeeForm import Ui_Dialog
+from table_model import CoffeeTableModel
+from table_delegate import CoffeeDelegate
+import catalog
+import metrics
+from workers import run_read, run_write, wait_for_all
+
+# The edit dialog (coffee_form) and catalog.bulk are imported on first use;
+# nothing in them is needed to show the window.
+startup.mark('импорт модулей')
+
+BULK_FILE_FILTER = "Каталог (*.csv *.jsonl *.json)"
+SNAPSHOT_FILE_FILTER = "Снимок каталога (*.sqlite.gz)"
+# How often to look for edits made by other instances sharing the file.
+SYNC_INTERVAL_MS = 1000
+DESCRIPTION_COLUMN = 4
 
 def get_resource_path(relative_path):
     try:
@@ -17,197 +32,336 @@ def get_resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
-def get_database_path():
-    if getattr(sys, 'frozen', False):
-        base_path = os.path.dirname(sys.executable)
-    else:
-        base_path = os.path.dirname(os.path.abspath(__file__))
-    
-    return os.path.join(base_path, 'data', 'coffee.sqlite')
-
-class AddEditCoffeeForm(QDialog, Ui_Dialog):
-    def __init__(self, parent=None, coffee_id=None):
-        super().__init__(parent)
-        self.setupUi(self)
-        self.coffee_id = coffee_id
-        self.setup_validators()
-        
-        if self.coffee_id:
-            self.load_coffee_data()
-            self.setWindowTitle("Редактирование кофе")
-        else:
-            self.setWindowTitle("Добавление нового кофе")
-            
-        self.cancelButton.clicked.connect(self.reject)
-        self.saveButton.clicked.connect(self.accept)
-        
-    def setup_validators(self):
-        price_validator = QDoubleValidator()
-        price_validator.setBottom(0)
-        self.priceEdit.setValidator(price_validator)
-        
-        volume_validator = QDoubleValidator()
-        volume_validator.setBottom(0)
-        self.volumeEdit.setValidator(volume_validator)
-            
-    def load_coffee_data(self):
-        try:
-            db_path = get_database_path()
-            os.makedirs(os.path.dirname(db_path), exist_ok=True)
-            
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM coffee WHERE id = ?", (self.coffee_id,))
-            coffee_data = cursor.fetchone()
-            conn.close()
-            
-            if coffee_data:
-                self.nameEdit.setText(coffee_data[1])
-                self.roastCombo.setCurrentText(coffee_data[2])
-                self.typeCombo.setCurrentText(coffee_data[3])
-                self.descriptionEdit.setPlainText(coffee_data[4])
-                self.priceEdit.setText(str(coffee_data[5]))
-                self.volumeEdit.setText(str(coffee_data[6]))
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка загрузки данных: {e}")
-    
-    def get_data(self):
-        return {
-            'name': self.nameEdit.text().strip(),
-            'roast_degree': self.roastCombo.currentText(),
-            'type': self.typeCombo.currentText(),
-            'description': self.descriptionEdit.toPlainText().strip(),
-            'price': self.priceEdit.text().strip(),
-            'volume': self.volumeEdit.text().strip()
-        }
-    
-    def validate_data(self, data):
-        if not data['name']:
-            QMessageBox.warning(self, "Ошибка", "Введите название кофе")
-            return False
-        if not data['price'] or float(data['price']) <= 0:
-            QMessageBox.warning(self, "Ошибка", "Введите корректную цену")
-            return False
-        if not data['volume'] or float(data['volume']) <= 0:
-            QMessageBox.warning(self, "Ошибка", "Введите корректный объем")
-            return False
-        return True
-
 class CoffeeApp(QMainWindow, Ui_MainWindow):
     def __init__(self):
         super().__init__()
+        self.painted = False
         self.setupUi(self)
         self.setup_ui()
-        self.load_data()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.painted:
+            # Touch the database only once the window is on screen.
+            self.painted = True
+            startup.mark('первая отрисовка')
+            QTimer.singleShot(0, self.load_data)
         
     def setup_ui(self):
+        self.model = CoffeeTableModel(parent=self)
+        self.tableView.setModel(self.model)
+        self.delegate = CoffeeDelegate(self.tableView)
+        self.tableView.setItemDelegate(self.delegate)
+        
+        # ResizeToContents would measure the columns again on every change;
+        # instead widths are fitted once per reload, from the rows on screen
+        # only (precision 0), and are left to the user after that.
+        header = self.tableView.horizontalHeader()
+        header.setResizeContentsPrecision(0)
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(DESCRIPTION_COLUMN, QHeaderView.ResizeMode.Stretch)
+        vertical_header = self.tableView.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(40)
+        self.tableView.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        header.sortIndicatorChanged.connect(self.on_sort_changed)
+        
+        self.statusLabel = QLabel(self)
+        self.progressBar = QProgressBar(self)
+        self.progressBar.setRange(0, 0)
+        self.progressBar.setMaximumWidth(150)
+        self.progressBar.hide()
+        self.statusBar().addWidget(self.statusLabel)
+        self.statusBar().addPermanentWidget(self.progressBar)
+        
+        self.filterTimer = QTimer(self)
+        self.filterTimer.setSingleShot(True)
+        self.filterTimer.setInterval(300)
+        self.filterTimer.timeout.connect(self.apply_filters)
+        self.searchEdit.textChanged.connect(self.schedule_filters)
+        for combo in (self.roastFilterCombo, self.typeFilterCombo):
+            combo.currentIndexChanged.connect(self.apply_filters)
+        for spin in (self.priceMinSpin, self.priceMaxSpin,
+                     self.volumeMinSpin, self.volumeMaxSpin):
+            spin.valueChanged.connect(self.schedule_filters)
+        self.resetFilterButton.clicked.connect(self.reset_filters)
+        
+        self.syncTimer = QTimer(self)
+        self.syncTimer.setInterval(SYNC_INTERVAL_MS)
+        self.syncTimer.timeout.connect(self.model.poll_changes)
+        
+        self.actionImport.triggered.connect(self.import_catalog)
+        self.actionExport.triggered.connect(self.export_catalog)
+        self.actionSnapshot.triggered.connect(self.create_snapshot)
+        self.actionRestore.triggered.connect(self.restore_snapshot)
+        self.actionAnalytics.triggered.connect(self.show_analytics)
         self.addButton.clicked.connect(self.add_coffee)
         self.editButton.clicked.connect(self.edit_coffee)
         self.deleteButton.clicked.connect(self.delete_coffee)
-        self.tableWidget.itemSelectionChanged.connect(self.on_selection_changed)
+        self.tableView.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        self.model.modelReset.connect(self.on_selection_changed)
+        self.model.loading_changed.connect(self.progressBar.setVisible)
+        self.model.rowsInserted.connect(self.update_status)
+        self.model.rowsInserted.connect(self.on_rows_inserted)
+        self.model.rowsRemoved.connect(self.update_status)
+        self.model.total_changed.connect(self.update_status)
+        self.model.load_failed.connect(self.on_db_error)
         self.on_selection_changed()
         
+        # Hidden on purpose: the diagnostics dialog is for support sessions.
+        self.paint_timer = None
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, self.show_diagnostics)
+        if metrics.enabled:
+            self.set_metrics_enabled(True)
+    
+    def show_analytics(self):
+        from analytics_dialog import AnalyticsDialog
+        AnalyticsDialog(self).exec()
+    
+    def show_diagnostics(self):
+        from diagnostics import DiagnosticsDialog
+        DiagnosticsDialog(self).exec()
+    
+    def set_metrics_enabled(self, enabled):
+        from diagnostics import PaintTimer
+        metrics.set_enabled(enabled)
+        if enabled and self.paint_timer is None:
+            self.paint_timer = PaintTimer(self.tableView, self)
+        elif not enabled and self.paint_timer is not None:
+            self.paint_timer.detach()
+            self.paint_timer = None
+        
     def on_selection_changed(self):
-        has_selection = len(self.tableWidget.selectedItems()) > 0
+        has_selection = self.tableView.selectionModel().hasSelection()
         self.editButton.setEnabled(has_selection)
         self.deleteButton.setEnabled(has_selection)
+    
+    def update_status(self):
+        self.statusLabel.setText(f"Загружено {self.model.rowCount()} из {self.model.total}")
+    
+    def on_rows_inserted(self, parent, first, last):
+        if first == 0:
+            # The first rows after a reload; fit once they are laid out.
+            QTimer.singleShot(0, self.fit_columns)
+    
+    def fit_columns(self):
+        for column in range(self.model.columnCount()):
+            if column != DESCRIPTION_COLUMN:
+                self.tableView.resizeColumnToContents(column)
+    
+    def on_sort_changed(self, column, order):
+        if not self.model.is_sortable(column):
+            order = Qt.SortOrder.DescendingOrder if self.model.descending else Qt.SortOrder.AscendingOrder
+            self.tableView.horizontalHeader().setSortIndicator(self.model.sort_column, order)
+    
+    def get_filters(self):
+        filters = {}
+        search = self.searchEdit.text().strip()
+        if search:
+            filters['search'] = search
+        if self.roastFilterCombo.currentIndex() > 0:
+            filters['roast_degree'] = self.roastFilterCombo.currentText()
+        if self.typeFilterCombo.currentIndex() > 0:
+            filters['type'] = self.typeFilterCombo.currentText()
+        for key, spin in (('price_min', self.priceMinSpin), ('price_max', self.priceMaxSpin),
+                          ('volume_min', self.volumeMinSpin), ('volume_max', self.volumeMaxSpin)):
+            if spin.value() > spin.minimum():
+                filters[key] = spin.value()
+        return filters
+    
+    def schedule_filters(self):
+        # Typing and spinning fire on every keystroke; wait for a pause
+        # before sending a new query.
+        self.filterTimer.start()
+    
+    def apply_filters(self):
+        self.filterTimer.stop()
+        filters = self.get_filters()
+        if filters != self.model.filters:
+            self.model.set_filters(filters)
+    
+    def reset_filters(self):
+        widgets = (self.searchEdit, self.roastFilterCombo, self.typeFilterCombo,
+                   self.priceMinSpin, self.priceMaxSpin, self.volumeMinSpin, self.volumeMaxSpin)
+        for widget in widgets:
+            widget.blockSignals(True)
+        self.searchEdit.clear()
+        self.roastFilterCombo.setCurrentIndex(0)
+        self.typeFilterCombo.setCurrentIndex(0)
+        for spin in widgets[3:]:
+            spin.setValue(spin.minimum())
+        for widget in widgets:
+            widget.blockSignals(False)
+        self.apply_filters()
+    
+    def on_db_error(self, error):
+        QMessageBox.critical(self, "Ошибка", f"Ошибка базы данных: {error}")
         
     def load_data(self):
-        try:
-            db_path = get_database_path()
-            os.makedirs(os.path.dirname(db_path), exist_ok=True)
-            
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS coffee (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                roast_degree TEXT NOT NULL,
-                type TEXT NOT NULL,
-                description TEXT,
-                price REAL NOT NULL,
-                volume REAL NOT NULL
-            )
-            ''')
-            
-            cursor.execute("SELECT * FROM coffee")
-            data = cursor.fetchall()
-            
-            if not data:
-                self.initialize_sample_data(cursor)
-                conn.commit()
-                cursor.execute("SELECT * FROM coffee")
-                data = cursor.fetchall()
-            
-            self.tableWidget.setRowCount(len(data))
-            self.tableWidget.setColumnCount(7)
-            self.tableWidget.setHorizontalHeaderLabels([
-                'ID', 'Название сорта', 'Степень обжарки', 'Молотый/в зернах', 
-                'Описание вкуса', 'Цена (руб)', 'Объем упаковки (г)'
-            ])
-            
-            for row_num, row_data in enumerate(data):
-                for col_num, col_data in enumerate(row_data):
-                    item = QTableWidgetItem(str(col_data))
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    item.setForeground(Qt.GlobalColor.black)
-                    self.tableWidget.setItem(row_num, col_num, item)
-            
-            header = self.tableWidget.horizontalHeader()
-            header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-            header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
-            header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-            header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
-            header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
-            header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
-            header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)
-            
-            self.tableWidget.verticalHeader().setDefaultSectionSize(40)
-            conn.close()
-            
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка базы данных: {e}")
-    
-    def initialize_sample_data(self, cursor):
-        coffee_data = [
-            ('Эфиопия Иргачефф', 'Средняя', 'Зерна', 'Цветочные и цитрусовые ноты с яркой кислотностью', 1250.0, 250.0),
-            ('Колумбия Супремо', 'Темная', 'Молотый', 'Шоколадный вкус с ореховыми нотами', 980.0, 250.0),
-            ('Кения АА', 'Светлая', 'Зерна', 'Ягодные тона с винным послевкусием', 1450.0, 200.0),
-            ('Бразилия Сантос', 'Средняя', 'Молотый', 'Ореховый вкус с сладким карамельным послевкусием', 850.0, 500.0),
-            ('Гватемала Антивей', 'Темная', 'Зерна', 'Дымный аромат с пряными нотами', 1100.0, 300.0),
-            ('Эспрессо Бленд', 'Темная', 'Молотый', 'Сбалансированный вкус для эспрессо', 920.0, 400.0),
-            ('Коста Рика Тарразу', 'Средняя', 'Зерна', 'Яркий вкус с нотками карамели и орехов', 1350.0, 250.0)
-        ]
-        
-        cursor.executemany('''
-        INSERT INTO coffee (name, roast_degree, type, description, price, volume)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ''', coffee_data)
+        # The table is shown empty straight away; rows stream in page by page
+        # from the worker threads once the schema is ready.
+        self.progressBar.show()
+        run_write(catalog.CatalogRepository.prepare,
+                  on_finished=metrics.timed('ui.load_data', self.on_database_ready),
+                  on_failed=self.on_load_failed)
+    
+    def on_database_ready(self, _):
+        startup.mark('база данных готова')
+        if startup.enabled():
+            self.model.loading_changed.connect(self.on_first_page)
+        self.model.reload()
+        self.syncTimer.start()
+    
+    def on_first_page(self, loading):
+        if loading:
+            return
+        self.model.loading_changed.disconnect(self.on_first_page)
+        startup.mark('первая страница')
+        startup.report()
+    
+    def on_load_failed(self, error):
+        self.progressBar.hide()
+        startup.report()
+        self.on_db_error(error)
+    
+    def import_catalog(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Импорт каталога", "", BULK_FILE_FILTER)
+        if not path:
+            return
+        from catalog.bulk import import_file
+        self.start_bulk_operation()
+        run_write(import_file, path,
+                  on_finished=self.on_import_finished,
+                  on_failed=self.on_bulk_failed,
+                  on_progress=lambda count: self.statusLabel.setText(f"Импорт: {count} записей"))
+    
+    def export_catalog(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Экспорт каталога", "catalog.csv", BULK_FILE_FILTER)
+        if not path:
+            return
+        from catalog.bulk import export_file
+        self.start_bulk_operation()
+        run_read(export_file, path, self.model.filters,
+                 on_finished=self.on_export_finished,
+                 on_failed=self.on_bulk_failed,
+                 on_progress=lambda count: self.statusLabel.setText(f"Экспорт: {count} записей"))
+    
+    def create_snapshot(self):
+        from catalog import snapshot
+        self.start_bulk_operation()
+        run_read(snapshot.create_snapshot, snapshot.snapshot_dir(), snapshot.KEEP,
+                 on_finished=self.on_snapshot_created,
+                 on_failed=self.on_bulk_failed,
+                 on_progress=lambda percent: self.statusLabel.setText(f"Снимок: {percent}%"))
+    
+    def restore_snapshot(self):
+        from catalog import snapshot
+        path, _ = QFileDialog.getOpenFileName(self, "Восстановить из снимка",
+                                              snapshot.snapshot_dir(), SNAPSHOT_FILE_FILTER)
+        if not path:
+            return
+        reply = QMessageBox.question(
+            self, "Восстановление",
+            "Текущий каталог будет заменен содержимым снимка. Продолжить?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        self.start_bulk_operation()
+        run_write(snapshot.restore_snapshot, path,
+                  on_finished=self.on_snapshot_restored,
+                  on_failed=self.on_bulk_failed,
+                  on_progress=lambda percent: self.statusLabel.setText(f"Восстановление: {percent}%"))
+    
+    def start_bulk_operation(self):
+        for action in (self.actionImport, self.actionExport,
+                       self.actionSnapshot, self.actionRestore):
+            action.setEnabled(False)
+        self.progressBar.show()
+    
+    def finish_bulk_operation(self):
+        for action in (self.actionImport, self.actionExport,
+                       self.actionSnapshot, self.actionRestore):
+            action.setEnabled(True)
+        self.progressBar.hide()
+        self.update_status()
+    
+    def on_import_finished(self, result):
+        self.finish_bulk_operation()
+        self.model.reload()
+        message = f"Импортировано: {result['imported']}, отклонено: {result['rejected']}"
+        if result['errors']:
+            message += "\n\n" + "\n".join(
+                f"Запись {number}: {error}" for number, error in result['errors'][:20])
+        QMessageBox.information(self, "Импорт", message)
+    
+    def on_export_finished(self, count):
+        self.finish_bulk_operation()
+        QMessageBox.information(self, "Экспорт", f"Экспортировано: {count}")
+    
+    def on_snapshot_created(self, path):
+        self.finish_bulk_operation()
+        QMessageBox.information(self, "Снимок", f"Снимок сохранен:\n{path}")
+    
+    def on_snapshot_restored(self, _):
+        self.finish_bulk_operation()
+        self.model.reload()
+        QMessageBox.information(self, "Восстановление", "Каталог восстановлен из снимка")
+    
+    def on_bulk_failed(self, error):
+        self.finish_bulk_operation()
+        QMessageBox.critical(self, "Ошибка", f"Ошибка обработки файла: {error}")
+    
+    def closeEvent(self, event):
+        self.syncTimer.stop()
+        self.model.cancel_loading()
+        wait_for_all()
+        super().closeEvent(event)
     
     def add_coffee(self):
+        from coffee_form import AddEditCoffeeForm
         dialog = AddEditCoffeeForm(self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             data = dialog.get_data()
             if dialog.validate_data(data):
                 self.save_coffee(data)
     
+    def selected_records(self):
+        rows = sorted(index.row() for index in self.tableView.selectionModel().selectedRows())
+        return [self.model.row_data(row) for row in rows]
+    
     def edit_coffee(self):
-        selected_row = self.tableWidget.currentRow()
-        if selected_row >= 0:
-            coffee_id = int(self.tableWidget.item(selected_row, 0).text())
-            dialog = AddEditCoffeeForm(self, coffee_id)
+        records = self.selected_records()
+        if len(records) > 1:
+            self.bulk_edit_coffee(records)
+            return
+        if records:
+            coffee_id = records[0].id
+            from coffee_form import AddEditCoffeeForm
+            dialog = AddEditCoffeeForm(self, coffee_id, self.model.cached_record(coffee_id))
             if dialog.exec() == QDialog.DialogCode.Accepted:
                 data = dialog.get_data()
                 if dialog.validate_data(data):
                     self.save_coffee(data, coffee_id)
     
+    def bulk_edit_coffee(self, records):
+        from coffee_form import BulkEditForm
+        dialog = BulkEditForm(self, len(records))
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            changes = dialog.get_changes()
+            if dialog.validate_changes(changes):
+                run_write(catalog.CatalogRepository.update_many,
+                          [record.id for record in records], changes,
+                          on_finished=metrics.timed('ui.bulk_edit', self.on_coffees_updated),
+                          on_failed=lambda e: QMessageBox.critical(
+                              self, "Ошибка", f"Ошибка сохранения: {e}"))
+    
     def delete_coffee(self):
-        selected_row = self.tableWidget.currentRow()
-        if selected_row >= 0:
-            coffee_id = int(self.tableWidget.item(selected_row, 0).text())
-            coffee_name = self.tableWidget.item(selected_row, 1).text()
+        records = self.selected_records()
+        if len(records) > 1:
+            self.bulk_delete_coffee(records)
+            return
+        if records:
+            coffee_id, coffee_name = records[0].id, records[0].name
             
             reply = QMessageBox.question(
                 self, 
@@ -217,50 +371,68 @@ class CoffeeApp(QMainWindow, Ui_MainWindow):
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                try:
-                    db_path = get_database_path()
-                    conn = sqlite3.connect(db_path)
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM coffee WHERE id = ?", (coffee_id,))
-                    conn.commit()
-                    conn.close()
-                    self.load_data()
-                    QMessageBox.information(self, "Успех", "Кофе удален успешно")
-                except sqlite3.Error as e:
-                    QMessageBox.critical(self, "Ошибка", f"Ошибка удаления: {e}")
+                run_write(catalog.CatalogRepository.delete, coffee_id,
+                          on_finished=metrics.timed('ui.delete_coffee', self.on_coffee_deleted),
+                          on_failed=lambda e: QMessageBox.critical(
+                              self, "Ошибка", f"Ошибка удаления: {e}"))
+    
+    def bulk_delete_coffee(self, records):
+        reply = QMessageBox.question(
+            self,
+            "Подтверждение удаления",
+            f"Вы уверены, что хотите удалить выбранные записи ({len(records)})?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            run_write(catalog.CatalogRepository.delete_many, [record.id for record in records],
+                      on_finished=metrics.timed('ui.bulk_delete', self.on_coffees_deleted),
+                      on_failed=lambda e: QMessageBox.critical(
+                          self, "Ошибка", f"Ошибка удаления: {e}"))
+    
+    def on_coffee_deleted(self, coffee_id):
+        if coffee_id is None:
+            # Already deleted elsewhere; the sync timer drops the row.
+            QMessageBox.warning(self, "Удаление", "Запись уже удалена в другом окне")
+            return
+        self.model.record_deleted(coffee_id)
+        QMessageBox.information(self, "Успех", "Кофе удален успешно")
+    
+    def on_coffees_deleted(self, coffee_ids):
+        self.model.records_deleted(coffee_ids)
+        QMessageBox.information(self, "Успех", f"Удалено записей: {len(coffee_ids)}")
+    
+    def on_coffees_updated(self, records):
+        self.model.records_saved(records)
+        QMessageBox.information(self, "Успех", f"Изменено записей: {len(records)}")
     
     def save_coffee(self, data, coffee_id=None):
-        try:
-            db_path = get_database_path()
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            if coffee_id:
-                cursor.execute('''
-                    UPDATE coffee 
-                    SET name=?, roast_degree=?, type=?, description=?, price=?, volume=?
-                    WHERE id=?
-                ''', (data['name'], data['roast_degree'], data['type'], 
-                      data['description'], float(data['price']), float(data['volume']), coffee_id))
-                message = "Кофе обновлен успешно"
-            else:
-                cursor.execute('''
-                    INSERT INTO coffee (name, roast_degree, type, description, price, volume)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (data['name'], data['roast_degree'], data['type'], 
-                      data['description'], float(data['price']), float(data['volume'])))
-                message = "Кофе добавлен успешно"
-            
-            conn.commit()
-            conn.close()
-            self.load_data()
-            QMessageBox.information(self, "Успех", message)
-            
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка сохранения: {e}")
+        on_failed = lambda e: QMessageBox.critical(self, "Ошибка", f"Ошибка сохранения: {e}")
+        if coffee_id:
+            run_write(catalog.CatalogRepository.update, coffee_id, data,
+                      on_finished=metrics.timed('ui.save_coffee', self.on_coffee_updated),
+                      on_failed=on_failed)
+        else:
+            run_write(catalog.CatalogRepository.insert, data,
+                      on_finished=metrics.timed('ui.save_coffee', self.on_coffee_inserted),
+                      on_failed=on_failed)
+    
+    def on_coffee_inserted(self, record):
+        self.model.record_saved(record, inserted=True)
+        QMessageBox.information(self, "Успех", "Кофе добавлен успешно")
+    
+    def on_coffee_updated(self, record):
+        if record is None:
+            QMessageBox.warning(self, "Ошибка сохранения",
+                                "Запись была удалена в другом окне, изменения не сохранены")
+            return
+        self.model.record_saved(record)
+        QMessageBox.information(self, "Успех", "Кофе обновлен успешно")
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
+    argv = startup.configure(sys.argv)
+    app = QApplication(argv)
+    startup.mark('QApplication')
     window = CoffeeApp()
+    startup.mark('создание окна')
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
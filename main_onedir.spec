@@ -0,0 +1,73 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Startup-optimized build: pyinstaller main_onedir.spec
+#
+# A onedir bundle starts without unpacking the archive into a temp dir on
+# every launch. Only the Qt pieces a widgets app needs are kept, and UPX is
+# off because compressed DLLs have to be inflated each time they are loaded.
+
+QT_PLUGINS = {
+    'platforms': {'qwindows.dll', 'libqxcb.so', 'libqcocoa.dylib'},
+    'styles': None,
+}
+QT_DROP = {'Qt6Pdf.dll', 'Qt6Svg.dll', 'Qt6Network.dll', 'opengl32sw.dll'}
+
+
+def keep_qt_file(entry):
+    dest = entry[0].replace('\\', '/')
+    name = dest.rsplit('/', 1)[-1]
+    if '/Qt6/translations/' in dest or name in QT_DROP:
+        return False
+    if '/Qt6/plugins/' in dest:
+        group = dest.split('/Qt6/plugins/', 1)[1].split('/', 1)[0]
+        if group not in QT_PLUGINS:
+            return False
+        return QT_PLUGINS[group] is None or name in QT_PLUGINS[group]
+    return True
+
+
+a = Analysis(
+    ['main.py'],
+    pathex=[],
+    binaries=[],
+    datas=[('UI', 'UI')],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=['tkinter', 'unittest', 'pydoc', 'doctest', 'ssl', '_ssl',
+              'PyQt6.QtNetwork', 'PyQt6.QtSvg', 'PyQt6.QtPdf'],
+    noarchive=False,
+    optimize=0,
+)
+a.binaries = [entry for entry in a.binaries if keep_qt_file(entry)]
+a.datas = [entry for entry in a.datas if keep_qt_file(entry)]
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='main',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    contents_directory='.',
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='main',
+)
@@ -0,0 +1,106 @@
+import bisect
+import os
+import threading
+import time
+from collections import deque
+
+# Upper bounds of the latency buckets, in milliseconds.
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+RECENT_SAMPLES = 1024
+
+enabled = os.environ.get('COFFEE_METRICS') == '1'
+_lock = threading.Lock()
+_metrics = {}
+
+
+class Metric:
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'rows', 'buckets', 'recent')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def add(self, elapsed_ms, rows):
+        self.count += 1
+        self.total += elapsed_ms
+        self.minimum = elapsed_ms if self.minimum is None else min(self.minimum, elapsed_ms)
+        self.maximum = max(self.maximum, elapsed_ms)
+        if rows is not None:
+            self.rows += rows
+        self.buckets[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+        self.recent.append(elapsed_ms)
+
+    def percentile(self, fraction):
+        samples = sorted(self.recent)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total,
+            'mean_ms': self.total / self.count if self.count else None,
+            'min_ms': self.minimum,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': self.maximum,
+            'rows': self.rows,
+            'histogram': {
+                (f"<={bound}" if bound is not None else f">{BUCKETS_MS[-1]}"): count
+                for bound, count in zip(BUCKETS_MS + (None,), self.buckets)
+            },
+        }
+
+
+def set_enabled(value):
+    global enabled
+    enabled = value
+
+
+def start():
+    # Callers keep the returned token and hand it to stop(); with metrics
+    # off both calls reduce to a flag check.
+    return time.perf_counter() if enabled else None
+
+
+def stop(name, started, rows=None):
+    if started is None:
+        return
+    record(name, time.perf_counter() - started, rows)
+
+
+def timed(name, callback):
+    # Wraps a completion callback so the time from now until it is called
+    # is recorded under name. Returns the callback itself when metrics are off.
+    started = start()
+    if started is None:
+        return callback
+
+    def finish(*args):
+        stop(name, started)
+        return callback(*args)
+    return finish
+
+
+def record(name, seconds, rows=None):
+    with _lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = Metric()
+        metric.add(seconds * 1000, rows)
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
+
+
+def snapshot():
+    with _lock:
+        return {name: metric.as_dict() for name, metric in sorted(_metrics.items())}
@@ -0,0 +1,98 @@
+import bisect
+from datetime import datetime
+
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtGui import QPainter, QPen, QColor, QPolygonF
+from PyQt6.QtCore import Qt, QPointF, QRectF, QSize
+
+MARGIN = 8
+
+
+def price_at(changes, times, at):
+    # changes are oldest first and times holds their changed_at values.
+    index = bisect.bisect_right(times, at)
+    return changes[index - 1] if index else None
+
+
+def format_time(value):
+    return datetime.fromtimestamp(value).strftime('%d.%m.%Y')
+
+
+class PriceChart(QWidget):
+    # Step chart of one coffee's price between two moments, drawn directly
+    # with QPainter; a history has a handful of points, so no caching.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.changes = []
+        self.times = []
+        self.start = None
+        self.end = None
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setMinimumHeight(120)
+
+    def sizeHint(self):
+        return QSize(460, 160)
+
+    def set_changes(self, changes):
+        self.changes = changes
+        self.times = [change['changed_at'] for change in changes]
+        self.update()
+
+    def set_range(self, start, end):
+        self.start = start
+        self.end = end
+        self.update()
+
+    def points(self):
+        # The price in force at the start of the range, then every change in it.
+        first = price_at(self.changes, self.times, self.start)
+        low = bisect.bisect_right(self.times, self.start)
+        high = bisect.bisect_right(self.times, self.end)
+        points = [(self.start, first['price'])] if first is not None else []
+        points += [(change['changed_at'], change['price']) for change in self.changes[low:high]]
+        return points
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), self.palette().base())
+        metrics = painter.fontMetrics()
+        text_height = metrics.height()
+        plot = QRectF(self.rect()).adjusted(MARGIN + metrics.horizontalAdvance('000000.00'),
+                                            MARGIN, -MARGIN, -MARGIN - text_height)
+        points = self.points() if self.changes and self.start is not None else []
+        if not points or plot.width() <= 0 or plot.height() <= 0:
+            painter.setPen(self.palette().text().color())
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Нет данных за период")
+            return
+
+        low = min(price for _, price in points)
+        high = max(price for _, price in points)
+        if high == low:
+            low, high = low * 0.9, high * 1.1 or 1.0
+        span = (self.end - self.start) or 1.0
+
+        def position(moment, price):
+            return QPointF(plot.left() + (moment - self.start) / span * plot.width(),
+                           plot.bottom() - (price - low) / (high - low) * plot.height())
+
+        painter.setPen(QPen(self.palette().mid().color()))
+        painter.drawRect(plot)
+        painter.setPen(self.palette().text().color())
+        for price, flags in ((high, Qt.AlignmentFlag.AlignTop), (low, Qt.AlignmentFlag.AlignBottom)):
+            painter.drawText(QRectF(0, plot.top(), plot.left() - 4, plot.height()),
+                             flags | Qt.AlignmentFlag.AlignRight, f"{price:.2f}")
+        labels = QRectF(plot.left(), plot.bottom(), plot.width(), text_height)
+        painter.drawText(labels, Qt.AlignmentFlag.AlignLeft, format_time(self.start))
+        painter.drawText(labels, Qt.AlignmentFlag.AlignRight, format_time(self.end))
+
+        # Each price holds until the next change, so draw steps, not slopes.
+        line = QPolygonF()
+        for (moment, price), (next_moment, _) in zip(points, points[1:] + [(self.end, None)]):
+            line.append(position(moment, price))
+            line.append(position(next_moment, price))
+        painter.setPen(QPen(QColor(Qt.GlobalColor.darkBlue), 2))
+        painter.drawPolyline(line)
+        painter.setBrush(QColor(Qt.GlobalColor.darkBlue))
+        for moment, price in points[1:] if points[0][0] == self.start else points:
+            painter.drawEllipse(position(moment, price), 3, 3)
@@ -0,0 +1,88 @@
+import sys
+from array import array
+
+from catalog import FIELDS, CoffeeRecord
+
+NUMERIC = {'id': 'q', 'price': 'd', 'volume': 'd'}
+ENUMS = ('roast_degree', 'type')
+
+
+class EnumColumn:
+    # Each distinct value is stored once (interned) and rows keep a code.
+    # Unknown values get the next code, so legacy data still fits; codes are
+    # four bytes wide, as imported files can bring any number of values.
+    def __init__(self):
+        self.codes = array('I')
+        self.values = []
+        self.index = {}
+
+    def code(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+
+class RecordColumns:
+    # The model's rows stored by column: ids, prices and volumes in typed
+    # arrays, roast degree and type as integer codes, and only name and
+    # description as Python objects. About a third of the memory of one
+    # CoffeeRecord per row; records are built again only when asked for.
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.columns = {}
+        for field in FIELDS:
+            if field in NUMERIC:
+                self.columns[field] = array(NUMERIC[field])
+            elif field in ENUMS:
+                self.columns[field] = EnumColumn()
+            else:
+                self.columns[field] = []
+        self.ids = self.columns['id']
+
+    def __len__(self):
+        return len(self.ids)
+
+    def value(self, row, field):
+        return self.columns[field][row]
+
+    def __getitem__(self, row):
+        return CoffeeRecord(*(self.columns[field][row] for field in FIELDS))
+
+    def __setitem__(self, row, record):
+        for field in FIELDS:
+            column = self.columns[field]
+            value = getattr(record, field)
+            if field in ENUMS:
+                column.codes[row] = column.code(value)
+            else:
+                column[row] = value
+
+    def insert(self, row, record):
+        for field in FIELDS:
+            column = self.columns[field]
+            value = getattr(record, field)
+            if field in ENUMS:
+                column.codes.insert(row, column.code(value))
+            else:
+                column.insert(row, value)
+
+    def extend(self, records):
+        for field in FIELDS:
+            column = self.columns[field]
+            values = [getattr(record, field) for record in records]
+            if field in ENUMS:
+                column.codes.extend(column.code(value) for value in values)
+            else:
+                column.extend(values)
+
+    def __delitem__(self, rows):
+        for field in FIELDS:
+            column = self.columns[field]
+            del (column.codes if field in ENUMS else column)[rows]
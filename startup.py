@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+
+_started = time.perf_counter()
+_marks = []
+_output = None
+_reported = False
+
+
+def configure(argv):
+    # --startup-report prints the timings to stderr, --startup-report=FILE
+    # writes them to FILE (windowed builds have no console).
+    global _output
+    rest = []
+    for arg in argv:
+        if arg == '--startup-report':
+            _output = '-'
+        elif arg.startswith('--startup-report='):
+            _output = arg.split('=', 1)[1]
+        else:
+            rest.append(arg)
+    return rest
+
+
+def enabled():
+    return _output is not None
+
+
+def mark(name):
+    _marks.append((name, time.perf_counter()))
+
+
+def process_age():
+    # Time from process creation to now: covers the bootloader and the
+    # interpreter start-up that happen before any of our code runs.
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+            created, exited, kernel, user, now = (wintypes.FILETIME() for _ in range(5))
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetProcessTimes(kernel32.GetCurrentProcess(), ctypes.byref(created),
+                                     ctypes.byref(exited), ctypes.byref(kernel), ctypes.byref(user))
+            kernel32.GetSystemTimeAsFileTime(ctypes.byref(now))
+            ticks = lambda value: (value.dwHighDateTime << 32) | value.dwLowDateTime
+            return (ticks(now) - ticks(created)) / 10 ** 7
+        with open('/proc/self/stat') as file:
+            started = int(file.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as file:
+            uptime = float(file.read().split()[0])
+        return uptime - started / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+def format_report():
+    lines = ["Запуск приложения (мс):", f"  {'этап':<28} {'шаг':>9} {'всего':>9}"]
+    age = process_age()
+    if age is not None:
+        before = age - (time.perf_counter() - _started)
+        lines.append(f"  {'до запуска main.py':<28} {before * 1000:9.1f}")
+    previous = _started
+    for name, moment in _marks:
+        lines.append(f"  {name:<28} {(moment - previous) * 1000:9.1f}"
+                     f" {(moment - _started) * 1000:9.1f}")
+        previous = moment
+    return "\n".join(lines)
+
+
+def report():
+    global _reported
+    if _output is None or _reported:
+        return
+    _reported = True
+    text = format_report()
+    if _output == '-':
+        print(text, file=sys.stderr, flush=True)
+    else:
+        with open(_output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
@@ -0,0 +1,32 @@
+from PyQt6.QtWidgets import QStyledItemDelegate
+from PyQt6.QtGui import QColor, QPalette
+from PyQt6.QtCore import Qt
+
+from catalog import FIELDS
+
+FORMATS = {
+    'price': '{:.2f}'.format,
+    'volume': '{:g}'.format,
+}
+
+
+class CoffeeDelegate(QStyledItemDelegate):
+    # One delegate for the whole table: the model hands out raw values and
+    # every cell is aligned, coloured and formatted here while it is painted
+    # or measured, instead of the model answering a role per cell.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.foreground = QColor(Qt.GlobalColor.black)
+        self.formats = [FORMATS.get(field) for field in FIELDS]
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        option.displayAlignment = Qt.AlignmentFlag.AlignCenter
+        option.palette.setColor(QPalette.ColorRole.Text, self.foreground)
+        format_value = self.formats[index.column()]
+        if format_value is not None:
+            option.text = format_value(index.data())
+
+    def displayText(self, value, locale):
+        # Plain str() as the table always showed, not the locale's rounding.
+        return str(value)
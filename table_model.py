@@ -0,0 +1,392 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+import catalog
+import metrics
+from catalog import FIELDS, RecordCache
+from record_columns import RecordColumns
+from workers import make_task, submit
+
+COLUMNS = [
+    'ID', 'Название сорта', 'Степень обжарки', 'Молотый/в зернах',
+    'Описание вкуса', 'Цена (руб)', 'Объем упаковки (г)'
+]
+
+PAGE_SIZE = 256
+
+
+class CoffeeTableModel(QAbstractTableModel):
+    loading_changed = pyqtSignal(bool)
+    load_failed = pyqtSignal(str)
+    total_changed = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = RecordColumns()
+        # id -> value of the sort field, enough to bisect for the row.
+        self.keys = {}
+        self.last_key = None
+        self.exhausted = True
+        self.active = False
+        self.task = None
+        self.count_task = None
+        self.poll_task = None
+        # Position in the change log the rows are current to; None until the
+        # first page of a reload has arrived with it.
+        self.change_seq = None
+        self.polled_version = None
+        self.page_stale = False
+        self.total = 0
+        self.filters = {}
+        self.sort_column = 0
+        self.descending = False
+        self.cache = RecordCache()
+
+    def reload(self):
+        self.cancel_loading()
+        self.active = True
+        self.change_seq = None
+        self.polled_version = None
+        self.beginResetModel()
+        self.rows.clear()
+        self.keys = {}
+        self.last_key = None
+        self.exhausted = False
+        self.endResetModel()
+        self.request_count()
+        # A view that is already laid out does not always ask an empty model
+        # for rows again, so the first page is requested here.
+        self.request_page()
+
+    def set_filters(self, filters):
+        self.filters = filters
+        if self.active:
+            self.reload()
+
+    def cancel_loading(self):
+        self.drop_poll()
+        if self.count_task is not None:
+            self.count_task.cancel()
+            self.count_task = None
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+            self.loading_changed.emit(False)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        # Raw values only; CoffeeDelegate does alignment, colour and number
+        # formatting for every cell in one place.
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self.rows.value(index.row(), FIELDS[index.column()])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if not self.is_sortable(column):
+            return
+        descending = order == Qt.SortOrder.DescendingOrder
+        if (column, descending) == (self.sort_column, self.descending):
+            return
+        self.sort_column = column
+        self.descending = descending
+        if self.active:
+            self.reload()
+
+    def is_sortable(self, column):
+        return FIELDS[column] in catalog.SORTABLE_FIELDS
+
+    def sort_key(self, record):
+        return (getattr(record, FIELDS[self.sort_column]), record.id)
+
+    def row_key(self, row):
+        return (self.rows.value(row, FIELDS[self.sort_column]), self.rows.ids[row])
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self.exhausted and self.task is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.request_page()
+
+    def request_page(self):
+        self.page_stale = False
+        # The callbacks need the task itself, so connect them before the task
+        # starts; a fast worker could otherwise emit before anyone listens.
+        if self.last_key is None:
+            task = make_task(catalog.CatalogRepository.first_page,
+                             (self.filters, FIELDS[self.sort_column], self.descending,
+                              PAGE_SIZE))
+        else:
+            task = make_task(catalog.CatalogRepository.page,
+                             (self.filters, FIELDS[self.sort_column], self.descending,
+                              self.last_key, PAGE_SIZE))
+        task.signals.finished.connect(lambda page: self.on_page_loaded(task, page))
+        task.signals.failed.connect(lambda error: self.on_page_failed(task, error))
+        self.task = submit(task)
+        self.loading_changed.emit(True)
+
+    def request_count(self):
+        task = make_task(catalog.CatalogRepository.count, (self.filters,))
+        task.signals.finished.connect(lambda total: self.on_count_loaded(task, total))
+        self.count_task = submit(task)
+
+    def on_count_loaded(self, task, total):
+        if task is not self.count_task:
+            return
+        self.count_task = None
+        self.set_total(total)
+
+    def set_total(self, total):
+        self.total = total
+        self.total_changed.emit(total)
+
+    def on_page_loaded(self, task, page):
+        if task is not self.task:
+            return
+        if self.page_stale:
+            # A local write landed while this page was in flight; the page may
+            # hold the pre-write row, so ask for the same page again.
+            self.request_page()
+            return
+        self.task = None
+        if isinstance(page, dict):
+            self.change_seq = page['seq']
+            # Records cached before the reload are only good if the log has
+            # not moved since they were last brought up to date.
+            self.cache.check_version(self.change_seq)
+            page = page['records']
+        if len(page) < PAGE_SIZE:
+            self.exhausted = True
+        if page:
+            self.last_key = self.sort_key(page[-1])
+            self.cache.put_many(page)
+        # Rows written locally while paging may already be in the model.
+        page = [record for record in page if record.id not in self.keys]
+        if page:
+            started = metrics.start()
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self.rows.extend(page)
+            field = FIELDS[self.sort_column]
+            for record in page:
+                self.keys[record.id] = getattr(record, field)
+            self.endInsertRows()
+            metrics.stop('ui.insert_rows', started, len(page))
+        self.loading_changed.emit(False)
+
+    def on_page_failed(self, task, error):
+        if task is not self.task:
+            return
+        self.task = None
+        self.exhausted = True
+        self.loading_changed.emit(False)
+        self.load_failed.emit(error)
+
+    def poll_changes(self):
+        # Called on a timer. The check runs on the poll thread, where an idle
+        # database costs one PRAGMA data_version per tick.
+        if not self.active or self.poll_task is not None or self.change_seq is None:
+            return
+        task = make_task(catalog.CatalogRepository.changes_after_commit,
+                         (self.change_seq, self.filters, self.polled_version))
+        task.signals.finished.connect(lambda delta: self.on_changes_loaded(task, delta))
+        task.signals.failed.connect(lambda error: self.on_changes_failed(task))
+        self.poll_task = submit(task, poll=True)
+
+    def drop_poll(self):
+        # A delta read before a local write would undo it on screen; drop it
+        # and let the next tick read again from the same change_seq.
+        if self.poll_task is not None:
+            self.poll_task.cancel()
+            self.poll_task = None
+
+    def on_changes_loaded(self, task, delta):
+        if task is not self.poll_task:
+            return
+        self.poll_task = None
+        if delta['reset']:
+            self.cache.clear()
+            self.reload()
+            return
+        self.change_seq = delta['seq']
+        self.polled_version = delta['version']
+        if delta['records']:
+            self.apply_records(delta['records'])
+            self.request_count()
+        # Every changed id was just replaced or dropped in the cache, so
+        # what is left there is current as of this seq.
+        self.cache.version = self.change_seq
+
+    def on_changes_failed(self, task):
+        if task is self.poll_task:
+            self.poll_task = None
+
+    def row_data(self, row):
+        return self.rows[row]
+
+    def cached_record(self, coffee_id):
+        # Serves the edit dialog from memory. The cache follows the change
+        # log like the rows on screen do, so it is exactly as fresh as they are.
+        return self.cache.get(coffee_id)
+
+    def bisect(self, key):
+        low, high = 0, len(self.rows)
+        while low < high:
+            middle = (low + high) // 2
+            middle_key = self.row_key(middle)
+            if (middle_key > key) if self.descending else (middle_key < key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find_row(self, coffee_id):
+        if coffee_id not in self.keys:
+            return -1
+        return self.bisect((self.keys[coffee_id], coffee_id))
+
+    def in_loaded_window(self, key):
+        if self.exhausted or self.last_key is None:
+            return self.exhausted
+        return key <= self.last_key if not self.descending else key >= self.last_key
+
+    def upsert_record(self, record):
+        self.page_stale = True
+        self.cache.put(record)
+        coffee_id = record.id
+        key = self.sort_key(record)
+        row = self.find_row(coffee_id)
+        if row >= 0 and self.keys[coffee_id] == key[0]:
+            self.rows[row] = record
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+            return row
+        if row >= 0:
+            self.remove_row(row, coffee_id)
+        # Rows past the loaded window are picked up by the next fetchMore.
+        if not self.in_loaded_window(key):
+            return -1
+        row = self.bisect(key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.rows.insert(row, record)
+        self.keys[coffee_id] = key[0]
+        self.endInsertRows()
+        return row
+
+    def remove_record(self, coffee_id):
+        self.page_stale = True
+        self.cache.discard(coffee_id)
+        row = self.find_row(coffee_id)
+        if row >= 0:
+            self.remove_row(row, coffee_id)
+        return row
+
+    def remove_row(self, row, coffee_id):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.rows[row]
+        del self.keys[coffee_id]
+        self.endRemoveRows()
+
+    def record_saved(self, record, inserted=False):
+        self.drop_poll()
+        self.cache.put(record)
+        if not self.filters:
+            if inserted:
+                self.set_total(self.total + 1)
+            self.upsert_record(record)
+            return
+        # Whether the row still matches the search is decided by SQL (FTS),
+        # so re-check just this id instead of guessing in Python.
+        self.page_stale = True
+        self.refresh_records([record.id])
+        self.request_count()
+
+    def record_deleted(self, coffee_id):
+        self.drop_poll()
+        self.remove_record(coffee_id)
+        if not self.filters:
+            self.set_total(self.total - 1)
+        else:
+            self.request_count()
+
+    def records_saved(self, records):
+        self.drop_poll()
+        self.page_stale = True
+        self.cache.put_many(records)
+        # Rows that change position or may leave the filtered set are placed
+        # by SQL in one reload; otherwise the rows are patched in place.
+        if self.filters or self.moves_rows(records):
+            self.reload()
+            return
+        changed = []
+        for record in records:
+            row = self.find_row(record.id)
+            if row >= 0:
+                self.rows[row] = record
+                changed.append(row)
+        if changed:
+            self.dataChanged.emit(self.index(min(changed), 0),
+                                  self.index(max(changed), len(COLUMNS) - 1))
+
+    def moves_rows(self, records):
+        field = FIELDS[self.sort_column]
+        for record in records:
+            if record.id in self.keys and self.keys[record.id] != getattr(record, field):
+                return True
+        return False
+
+    def records_deleted(self, coffee_ids):
+        self.drop_poll()
+        self.page_stale = True
+        rows = []
+        for coffee_id in coffee_ids:
+            self.cache.discard(coffee_id)
+            row = self.find_row(coffee_id)
+            if row >= 0:
+                rows.append(row)
+        # Remove contiguous runs from the bottom up so earlier indexes stay valid.
+        rows.sort()
+        end = len(rows)
+        while end:
+            end -= 1
+            first = last = rows[end]
+            while end and rows[end - 1] == first - 1:
+                end -= 1
+                first -= 1
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for coffee_id in self.rows.ids[first:last + 1]:
+                del self.keys[coffee_id]
+            del self.rows[first:last + 1]
+            self.endRemoveRows()
+        self.request_count()
+
+    def refresh_records(self, coffee_ids):
+        filters = self.filters
+        task = make_task(catalog.CatalogRepository.get_many, (coffee_ids, filters))
+        task.signals.finished.connect(
+            lambda results: filters is self.filters and self.apply_records(results))
+        submit(task)
+
+    def apply_records(self, results):
+        for coffee_id, record in results:
+            if record is None:
+                self.remove_record(coffee_id)
+            else:
+                self.upsert_record(record)
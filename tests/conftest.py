@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from catalog import CatalogRepository
+
+# The file shipped before schema versioning (user_version 0).
+BASELINE_SCHEMA = '''
+CREATE TABLE coffee (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    roast_degree TEXT NOT NULL,
+    type TEXT NOT NULL,
+    description TEXT,
+    price REAL NOT NULL,
+    volume REAL NOT NULL
+)
+'''
+
+
+def make_rows(count, start=0):
+    return [(f"Сорт {number}", ('Светлая', 'Средняя', 'Темная')[number % 3],
+             ('Зерна', 'Молотый')[number % 2], f"Описание {number}",
+             100.0 + number, 250.0) for number in range(start, start + count)]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'coffee.sqlite')
+
+
+@pytest.fixture
+def repository(db_path):
+    repository = CatalogRepository.open(db_path)
+    repository.prepare(seed=False)
+    yield repository
+    repository.close()
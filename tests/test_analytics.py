@@ -0,0 +1,27 @@
+from catalog import analytics
+from conftest import make_rows
+
+
+def naive_quartiles(prices):
+    prices = sorted(prices)
+    return [prices[min(len(prices) - 1, int(len(prices) * fraction))]
+            for fraction in analytics.QUARTILES]
+
+
+def test_price_distribution(repository):
+    rows = make_rows(997)
+    # A skewed spread, so the quartiles fall in different buckets.
+    rows = [row[:4] + (100.0 + (number % 50) ** 2, row[5])
+            for number, row in enumerate(rows)]
+    repository.insert_many(rows)
+    distribution = analytics.compute_summary(repository.conn)['price_distribution']
+    assert len(distribution['buckets']) == analytics.HISTOGRAM_BUCKETS
+    assert sum(bucket['count'] for bucket in distribution['buckets']) == 997
+    assert distribution['quartiles'] == naive_quartiles(row[4] for row in rows)
+
+
+def test_price_distribution_single_price(repository):
+    repository.insert_many(make_rows(5, start=0)[:1] * 5)
+    distribution = analytics.compute_summary(repository.conn)['price_distribution']
+    assert distribution['buckets'] == [{'from': 100.0, 'to': 100.0, 'count': 5}]
+    assert distribution['quartiles'] == [100.0] * 3
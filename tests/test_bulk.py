@@ -0,0 +1,69 @@
+import csv
+
+from catalog.bulk import FIELDS, import_file, import_records, read_records
+
+GOOD = {'name': 'Кения АА', 'roast_degree': 'Светлая', 'type': 'Зерна',
+        'description': 'ягодные', 'price': '900', 'volume': '250'}
+
+
+def write_jsonl(path, lines):
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def test_read_jsonl_rejects_bad_lines(tmp_path):
+    path = write_jsonl(tmp_path / 'in.jsonl', [
+        '{"name": "Кения АА", "roast_degree": "Светлая", "type": "Зерна", '
+        '"price": "900", "volume": "250"}',
+        '{bad',
+        '[1, 2]',
+        '',
+        '"строка"',
+    ])
+    records = list(read_records(path))
+    assert len(records) == 4
+    assert records[0]['name'] == 'Кения АА'
+    assert all(isinstance(record, ValueError) for record in records[1:])
+
+
+def test_read_csv_rejects_bad_row(tmp_path):
+    path = tmp_path / 'in.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDS)
+        writer.writerow([GOOD[field] for field in FIELDS])
+        writer.writerow(['x' * (csv.field_size_limit() + 1)] + [''] * 5)
+        writer.writerow([GOOD[field] for field in FIELDS])
+    records = list(read_records(str(path)))
+    assert [isinstance(record, ValueError) for record in records] == [False, True, False]
+
+
+def test_import_counts_rejected_rows(repository, tmp_path):
+    path = write_jsonl(tmp_path / 'in.jsonl', [
+        '{"name": "Кения АА", "roast_degree": "Светлая", "type": "Зерна", '
+        '"price": "900", "volume": "250"}',
+        '{bad',
+        '{"name": 5, "roast_degree": "Светлая", "type": "Зерна", "price": 1, "volume": 1}',
+        '{"name": "Без цены", "roast_degree": "Светлая", "type": "Зерна", "volume": 1}',
+        '{"name": "Обжарка", "roast_degree": "Нет такой", "type": "Зерна", '
+        '"price": 1, "volume": 1}',
+    ])
+    result = import_file(repository, path)
+    assert result['imported'] == 1
+    assert result['rejected'] == 4
+    assert [number for number, _ in result['errors']] == [2, 3, 4, 5]
+    assert repository.count() == 1
+
+
+def test_import_records_in_chunks(repository):
+    records = [dict(GOOD, name=f"Сорт {number}") for number in range(25)]
+    records[10] = ValueError("Запись должна быть объектом")
+    records[20] = dict(GOOD, price='-1')
+    progress = []
+    result = import_records(repository, iter(records), chunk_size=10, progress=progress.append)
+    assert result['imported'] == 23
+    assert result['rejected'] == 2
+    assert result['errors'][0] == (11, "Запись должна быть объектом")
+    assert result['errors'][1][0] == 21
+    assert repository.count() == 23
+    assert progress == [10, 20, 23]
@@ -0,0 +1,79 @@
+from catalog import CatalogRepository
+from conftest import make_rows
+
+EDIT = {'name': 'Новое имя', 'roast_degree': 'Темная', 'type': 'Зерна',
+        'description': 'изменено', 'price': '500', 'volume': '250'}
+
+
+def test_changes_since_returns_delta(repository):
+    repository.insert_many(make_rows(5))
+    seq = repository.last_change()
+    updated = repository.update(1, EDIT)
+    repository.delete(2)
+    delta = repository.changes_since(seq)
+    assert not delta['reset']
+    assert delta['seq'] == repository.last_change()
+    assert sorted(delta['records']) == [(1, updated), (2, None)]
+    # Nothing after the last seq: an empty delta at the same position.
+    assert repository.changes_since(delta['seq']) == {
+        'seq': delta['seq'], 'reset': False, 'records': []}
+
+
+def test_changes_since_applies_filters(repository):
+    repository.insert_many(make_rows(3))
+    seq = repository.last_change()
+    repository.update(1, EDIT)
+    repository.update(3, dict(EDIT, name='Сорт 3 обновлен'))
+    delta = repository.changes_since(seq, {'search': 'Сорт'})
+    records = dict(delta['records'])
+    # Row 1 no longer matches and reads back as None.
+    assert records[1] is None
+    assert records[3].name == 'Сорт 3 обновлен'
+
+
+def test_changes_since_resets_past_limit(repository):
+    repository.insert_many(make_rows(5))
+    seq = repository.last_change()
+    for coffee_id in (1, 2, 3):
+        repository.update(coffee_id, EDIT)
+    assert not repository.changes_since(seq, limit=3)['reset']
+    delta = repository.changes_since(seq, limit=2)
+    assert delta == {'seq': repository.last_change(), 'reset': True, 'records': []}
+
+
+def test_changes_since_resets_when_log_does_not_reach(repository):
+    repository.insert_many(make_rows(10))
+    last = repository.last_change()
+    with repository.conn:
+        repository.prune_changes(keep=3)
+    assert repository.changes_since(last - 3)['reset'] is False
+    assert repository.changes_since(last - 4)['reset']
+    # A seq ahead of the log means the file was replaced underneath.
+    assert repository.changes_since(last + 5)['reset']
+
+
+def test_changes_since_empty_log(repository):
+    assert repository.changes_since(0) == {'seq': 0, 'reset': False, 'records': []}
+    assert repository.changes_since(7)['reset']
+
+
+def test_changes_after_commit_gates_on_data_version(repository, db_path):
+    repository.insert_many(make_rows(3))
+    seq = repository.last_change()
+    delta = repository.changes_after_commit(seq, None, None)
+    assert delta['records'] == [] and not delta['reset']
+    version = delta['version']
+
+    # Nothing committed since: the same position and version come back.
+    assert repository.changes_after_commit(seq, None, version) == {
+        'seq': seq, 'reset': False, 'records': [], 'version': version}
+
+    other = CatalogRepository.open(db_path)
+    try:
+        updated = other.update(2, EDIT)
+    finally:
+        other.close()
+    delta = repository.changes_after_commit(seq, None, version)
+    assert delta['version'] != version
+    assert delta['records'] == [(2, updated)]
+    assert delta['seq'] == seq + 1
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+
+import pytest
+
+from catalog import CatalogRepository
+from catalog.migrations import SCHEMA_VERSION, migrate, schema_version
+from catalog.query import RECORD_SQL
+from conftest import BASELINE_SCHEMA, make_rows
+
+
+@pytest.fixture
+def baseline_path(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(BASELINE_SCHEMA)
+    conn.executemany(
+        "INSERT INTO coffee (id, name, roast_degree, type, description, price, volume) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(9, 'Эфиопия Иргачефф', 'Средняя', 'Зерна', 'Цветочные ноты', 1250.0, 250.0),
+         (10, 'Колумбия Супремо', 'Темная', 'Молотый', None, 980.0, 250.0),
+         (12, 'Старый бленд', 'Очень темная', 'Зерна', 'Горький шоколад', 700.0, 500.0)])
+    # Rows 13-15 were deleted; their ids must not come back.
+    conn.execute("UPDATE sqlite_sequence SET seq = 15 WHERE name = 'coffee'")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_upgrade_baseline_file(baseline_path):
+    repository = CatalogRepository.open(baseline_path)
+    try:
+        repository.prepare(seed=False)
+        conn = repository.conn
+        assert schema_version(conn) == SCHEMA_VERSION
+        assert os.path.exists(f"{baseline_path}.v0.bak")
+
+        records = {record.id: record for record in repository.query(RECORD_SQL)}
+        assert sorted(records) == [9, 10, 12]
+        assert records[12].roast_degree == 'Очень темная'
+        assert records[10].description == ''
+        assert records[9].price == 1250.0
+
+        # Lookup ids follow name order, the legacy value included.
+        names = [name for name, in conn.execute("SELECT name FROM roast_degrees ORDER BY id")]
+        assert names == sorted(names)
+        assert 'Очень темная' in names
+
+        assert repository.count({'search': 'шоколад'}) == 1
+        assert repository.count({'roast_degree': 'Очень темная'}) == 1
+        assert len(repository.price_changes()) == 3
+
+        record = repository.insert({'name': 'Новый', 'roast_degree': 'Средняя', 'type': 'Зерна',
+                                    'description': '', 'price': '1,5', 'volume': 100})
+        assert record.id == 16
+    finally:
+        repository.close()
+
+
+def test_upgrade_rolls_back_on_invalid_row(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(BASELINE_SCHEMA)
+    conn.execute("INSERT INTO coffee (name, roast_degree, type, description, price, volume) "
+                 "VALUES ('Бесплатный', 'Средняя', 'Зерна', '', 0, 250)")
+    conn.commit()
+    with pytest.raises(sqlite3.IntegrityError):
+        migrate(conn)
+    # The failed step left the file as the previous step committed it.
+    assert schema_version(conn) == 1
+    assert conn.execute("SELECT roast_degree, price FROM coffee").fetchall() == [('Средняя', 0.0)]
+    conn.close()
+
+
+def test_refuses_newer_schema(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    with pytest.raises(sqlite3.DatabaseError):
+        migrate(conn)
+    assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+    conn.close()
+
+
+def test_insert_many_keeps_logs_consistent(repository):
+    repository.insert(dict(zip(('name', 'roast_degree', 'type', 'description', 'price', 'volume'),
+                               make_rows(1)[0])))
+    repository.insert_many(make_rows(500, start=1))
+    conn = repository.conn
+
+    ids = [coffee_id for coffee_id, in conn.execute("SELECT id FROM coffee ORDER BY id")]
+    assert len(ids) == 501
+    assert repository.count({'search': 'Описание'}) == 501
+    assert repository.count({'search': 'Сорт 499'}) == 1
+    changes = conn.execute("SELECT coffee_id, op FROM coffee_changes ORDER BY seq").fetchall()
+    assert changes == [(coffee_id, 'I') for coffee_id in ids]
+    history = conn.execute(
+        "SELECT coffee_id, price, volume FROM price_history ORDER BY coffee_id").fetchall()
+    assert history == [(record.id, record.price, record.volume)
+                       for record in repository.query(f"{RECORD_SQL} ORDER BY id")]
+
+    # The per-row triggers are back for ordinary writes.
+    triggers = {name for name, in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    assert {'coffee_fts_insert', 'coffee_changes_insert', 'coffee_history_insert'} <= triggers
+    record = repository.insert({'name': 'Последний', 'roast_degree': 'Темная', 'type': 'Зерна',
+                                'description': 'уникальный', 'price': 1, 'volume': 1})
+    assert repository.count({'search': 'уникальный'}) == 1
+    assert repository.changes_since(repository.last_change() - 1)['records'] == [(record.id, record)]
+    assert repository.price_as_of(record.id, float('inf'))['price'] == 1.0
@@ -0,0 +1,14 @@
+from catalog import CoffeeRecord
+from record_columns import RecordColumns
+
+
+def test_many_distinct_enum_values():
+    rows = RecordColumns()
+    rows.extend([CoffeeRecord(number, f"Сорт {number}", f"Обжарка {number}", 'Зерна',
+                              None, 100.0, 250.0) for number in range(300)])
+    rows.insert(0, CoffeeRecord(1000, 'Новый', 'Обжарка 1000', 'Молотый', None, 1.0, 1.0))
+    assert len(rows) == 301
+    assert rows.value(0, 'roast_degree') == 'Обжарка 1000'
+    assert rows.value(300, 'roast_degree') == 'Обжарка 299'
+    assert rows[300] == CoffeeRecord(299, 'Сорт 299', 'Обжарка 299', 'Зерна',
+                                     None, 100.0, 250.0)
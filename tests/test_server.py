@@ -0,0 +1,117 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+
+from catalog import db
+from catalog.server import CatalogServer, MAX_BULK_IDS, encode_cursor
+from conftest import make_rows
+
+GOOD = {'name': 'Кения АА', 'roast_degree': 'Светлая', 'type': 'Зерна',
+        'description': 'ягодные', 'price': 900, 'volume': 250}
+
+
+@pytest.fixture
+def server(repository, db_path, monkeypatch):
+    repository.insert_many(make_rows(10))
+    monkeypatch.setattr(db, '_database_path', db_path)
+    server = CatalogServer(readers=1)
+    yield server
+    server.close()
+
+
+def call(server, method, path, body=None, query=''):
+    request = {'method': method, 'path': path, 'query': query, 'headers': {},
+               'body': b'' if body is None else json.dumps(body).encode(),
+               'keep_alive': True}
+    return asyncio.run(server.dispatch(request))
+
+
+def test_route_paths(server):
+    assert call(server, 'GET', '/coffee/3')[0] == HTTPStatus.OK
+    assert call(server, 'GET', '/coffee/99')[0] == HTTPStatus.NOT_FOUND
+    # Only plain decimal ids are routed; '²' is a digit to isdigit().
+    assert call(server, 'GET', '/coffee/²')[0] == HTTPStatus.NOT_FOUND
+    assert call(server, 'GET', '/coffee/-1')[0] == HTTPStatus.NOT_FOUND
+    status, _, headers = call(server, 'PATCH', '/coffee/3')
+    assert status == HTTPStatus.METHOD_NOT_ALLOWED
+    assert headers['Allow'] == 'GET, PUT, DELETE'
+
+
+def test_list_cursor(server, repository):
+    status, payload, _ = call(server, 'GET', '/coffee', query='limit=4&sort=price')
+    assert status == HTTPStatus.OK
+    assert [item['id'] for item in payload['items']] == [1, 2, 3, 4]
+    status, payload, _ = call(server, 'GET', '/coffee',
+                              query=f"limit=4&sort=price&after={payload['next']}")
+    assert [item['id'] for item in payload['items']] == [5, 6, 7, 8]
+
+    status, payload, _ = call(server, 'GET', '/coffee',
+                              query='limit=20&sort=price&after=' + payload['next'])
+    assert [item['id'] for item in payload['items']] == [9, 10]
+    assert payload['next'] is None
+
+
+@pytest.mark.parametrize('cursor', [
+    'zzz', '!!', 'bnVsbA',  # not base64 JSON, JSON null
+    'WzEsMl0x',  # trailing junk
+    'WyJhIiwiYiJd',  # ["a","b"]: id is not an int
+    'W3RydWUsMV0',  # [true,1]
+    'W1tdLDFd',  # [[],1]
+    'WzEsMiwzXQ',  # three items
+])
+def test_list_rejects_bad_cursor(server, cursor):
+    status, payload, _ = call(server, 'GET', '/coffee', query=f'after={cursor}')
+    assert status == HTTPStatus.BAD_REQUEST
+    assert payload == {'error': "Некорректный курсор"}
+
+
+def test_cursor_round_trip(server, repository):
+    record = repository.get(5)
+    status, payload, _ = call(server, 'GET', '/coffee',
+                              query=f"sort=name&after={encode_cursor(record, 'name')}")
+    assert status == HTTPStatus.OK
+    assert all(item['name'] > record.name for item in payload['items'])
+
+
+def test_bulk_create(server, repository):
+    status, payload, _ = call(server, 'POST', '/coffee/bulk',
+                              [GOOD, dict(GOOD, name=''), dict(GOOD, price='abc')])
+    assert status == HTTPStatus.OK
+    assert payload['imported'] == 1
+    assert payload['rejected'] == 2
+    assert [number for number, _ in payload['errors']] == [2, 3]
+    assert repository.count() == 11
+    for body in ({'items': []}, [GOOD, 5], 'строка'):
+        assert call(server, 'POST', '/coffee/bulk', body)[0] == HTTPStatus.BAD_REQUEST
+
+
+def test_bulk_update(server, repository):
+    status, payload, _ = call(server, 'PATCH', '/coffee/bulk',
+                              {'ids': [1, 2, 99], 'changes': {'price': 9.5}})
+    assert status == HTTPStatus.OK
+    assert [(item['id'], item['price']) for item in payload['items']] == [(1, 9.5), (2, 9.5)]
+    assert call(server, 'PATCH', '/coffee/bulk', {'ids': [1]})[0] == HTTPStatus.BAD_REQUEST
+    status, _, _ = call(server, 'PATCH', '/coffee/bulk',
+                        {'ids': [1], 'changes': {'name': 'x'}})
+    assert status == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert repository.get(1).price == 9.5
+
+
+@pytest.mark.parametrize('body', [
+    {}, {'ids': []}, {'ids': 'all'}, {'ids': [1, '2']}, {'ids': [True]}, {'ids': [1.0]}, [1, 2],
+])
+def test_bulk_rejects_bad_ids(server, body):
+    assert call(server, 'DELETE', '/coffee/bulk', body)[0] == HTTPStatus.BAD_REQUEST
+
+
+def test_bulk_delete(server, repository):
+    status, payload, _ = call(server, 'DELETE', '/coffee/bulk', {'ids': [3, 99, 1, 3]})
+    assert status == HTTPStatus.OK
+    assert payload == {'deleted': [3, 1]}
+    assert repository.count() == 8
+    status, _, _ = call(server, 'DELETE', '/coffee/bulk',
+                        {'ids': list(range(1, MAX_BULK_IDS + 2))})
+    assert status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert call(server, 'DELETE', '/coffee/bulk')[0] == HTTPStatus.BAD_REQUEST
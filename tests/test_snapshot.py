@@ -0,0 +1,74 @@
+import gzip
+import os
+
+import pytest
+
+from catalog import CatalogRepository
+from catalog.snapshot import create_snapshot, restore_snapshot, list_snapshots
+from conftest import make_rows
+
+
+def test_snapshot_round_trip(repository, db_path, tmp_path):
+    directory = str(tmp_path / 'snapshots')
+    repository.insert_many(make_rows(300))
+    path = create_snapshot(repository, directory)
+    assert path.endswith('.sqlite.gz')
+    assert os.listdir(directory) == [os.path.basename(path)]
+
+    repository.delete_many(list(range(1, 101)))
+    seq = repository.last_change()
+    other = CatalogRepository.open(db_path)
+    try:
+        restored_seq = restore_snapshot(repository, path)
+        assert other.count() == 300
+    finally:
+        other.close()
+
+    assert repository.count() == 300
+    assert repository.count({'search': 'Сорт 0'}) == 1
+    # The log moves forward past every seq handed out before the restore,
+    # and an instance that was at seq has to reload.
+    assert restored_seq > seq
+    assert repository.changes_since(seq)['reset']
+    assert repository.conn.execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
+    assert not [name for name in os.listdir(tmp_path) if '.restore' in name]
+
+
+def test_snapshots_rotate(repository, tmp_path):
+    directory = str(tmp_path / 'snapshots')
+    paths = [create_snapshot(repository, directory, keep=2) for _ in range(3)]
+    assert list_snapshots(directory) == paths[:0:-1]
+
+
+def test_restore_rejects_bad_file(repository, tmp_path):
+    repository.insert_many(make_rows(10))
+    seq = repository.last_change()
+    path = str(tmp_path / 'bad.sqlite.gz')
+    with gzip.open(path, 'wb') as file:
+        file.write(b'not a database' * 100)
+    with pytest.raises(ValueError):
+        restore_snapshot(repository, path)
+    assert repository.count() == 10
+    assert repository.last_change() == seq
+
+
+def test_restore_rejects_corrupt_stream(repository, tmp_path):
+    repository.insert_many(make_rows(300))
+    path = create_snapshot(repository, str(tmp_path / 'snapshots'))
+    data = bytearray(open(path, 'rb').read())
+    # Past the gzip header, so only the deflate stream is broken.
+    for position in range(2000, 2100):
+        data[position] ^= 0xff
+    broken = str(tmp_path / 'broken.sqlite.gz')
+    with open(broken, 'wb') as file:
+        file.write(data)
+    with pytest.raises(ValueError):
+        restore_snapshot(repository, broken)
+    assert repository.count() == 300
+
+
+def test_snapshot_keeps_at_least_one(repository, tmp_path):
+    directory = str(tmp_path / 'snapshots')
+    with pytest.raises(ValueError):
+        create_snapshot(repository, directory, keep=0)
+    assert list_snapshots(directory) == []
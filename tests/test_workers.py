@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+QtCore = pytest.importorskip('PyQt6.QtCore')
+
+import catalog
+import catalog.db
+import workers
+from catalog import CatalogRepository
+
+
+@pytest.fixture
+def counted_connects(repository, db_path, monkeypatch):
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    catalog.set_database_path(db_path)
+    connects = []
+    connect = catalog.db.connect
+    monkeypatch.setattr(catalog.db, 'connect',
+                        lambda path=None: connects.append(path) or connect(path))
+    yield connects
+    workers.wait_for_all()
+    app.processEvents()
+    catalog.set_database_path(None)
+
+
+def test_pool_threads_reuse_their_connection(counted_connects):
+    workers.reader_pool().setMaxThreadCount(2)
+    for _ in range(25):
+        workers.run_read(CatalogRepository.count)
+        workers.run_write(CatalogRepository.count)
+    workers.wait_for_all()
+    # One connection per pool thread (two readers, one writer), not per task.
+    assert len(counted_connects) <= 3
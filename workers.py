@@ -0,0 +1,163 @@
+import sqlite3
+import threading
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+import catalog
+import metrics
+
+_reader_pool = None
+_writer_pool = None
+_poll_pool = None
+_running = set()
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int)
+    done = pyqtSignal()
+
+
+class DbTask(QRunnable):
+    def __init__(self, func, *args):
+        super().__init__()
+        # Python owns the task (see submit), so cancel() can still reach
+        # the pool after run() has returned.
+        self.setAutoDelete(False)
+        self.func = func
+        self.args = args
+        self.cancelled = False
+        self.signals = TaskSignals()
+        self.queued = metrics.start()
+        self.pool = None
+        self.write = False
+        self.lock = threading.Lock()
+        self.conn = None
+
+    def cancel(self):
+        # A superseded read should not hold up the ones behind it: a queued
+        # task is taken off the pool, a running one has its query
+        # interrupted. Writes are never stopped, only their result is dropped.
+        self.cancelled = True
+        if self.write:
+            return
+        if self.pool is not None and self.pool.tryTake(self):
+            self.signals.done.emit()
+            return
+        with self.lock:
+            if self.conn is not None:
+                self.conn.interrupt()
+
+    def report_progress(self, done):
+        if not self.cancelled:
+            self.signals.progress.emit(done)
+
+    def run(self):
+        started = metrics.start()
+        if started is not None and self.queued is not None:
+            metrics.record('db.queue_wait', started - self.queued)
+        try:
+            repository = catalog.get_repository()
+            with self.lock:
+                self.conn = repository.conn
+            if self.cancelled:
+                return
+            result = self.func(repository, *self.args)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            metrics.stop('db.cancelled' if self.cancelled else 'db.failed', started)
+            if not self.cancelled:
+                self.signals.failed.emit(str(e))
+        except Exception as e:
+            # Anything else is a bug, but it must not escape run(): PyQt aborts
+            # the process on an exception from a worker thread, and the caller
+            # still needs failed to put its progress bar and actions back.
+            traceback.print_exc()
+            metrics.stop('db.failed', started)
+            if not self.cancelled:
+                self.signals.failed.emit(f"{type(e).__name__}: {e}")
+        else:
+            if started is not None:
+                metrics.stop('db.' + self.func.__qualname__, started,
+                             len(result) if isinstance(result, list) else None)
+            if not self.cancelled:
+                self.signals.finished.emit(result)
+        finally:
+            with self.lock:
+                # The connection goes on to the thread's next task.
+                self.conn = None
+            self.signals.done.emit()
+
+
+def reader_pool():
+    global _reader_pool
+    if _reader_pool is None:
+        _reader_pool = QThreadPool.globalInstance()
+        # Threads that never expire keep their SQLite connections (see
+        # catalog.db.get_connection) instead of leaving them behind.
+        _reader_pool.setExpiryTimeout(-1)
+    return _reader_pool
+
+
+def writer_pool():
+    # Writes go through a single thread so they reach SQLite in the order the
+    # user made them and never compete with each other for the write lock.
+    global _writer_pool
+    if _writer_pool is None:
+        _writer_pool = QThreadPool()
+        _writer_pool.setMaxThreadCount(1)
+        _writer_pool.setExpiryTimeout(-1)
+    return _writer_pool
+
+
+def poll_pool():
+    # Change polling gets one thread of its own, and so one connection whose
+    # PRAGMA data_version can be compared from tick to tick.
+    global _poll_pool
+    if _poll_pool is None:
+        _poll_pool = QThreadPool()
+        _poll_pool.setMaxThreadCount(1)
+        _poll_pool.setExpiryTimeout(-1)
+    return _poll_pool
+
+
+def submit(task, write=False, poll=False):
+    # Keep the task (and its signals object) alive until the GUI thread has
+    # delivered its queued results; dropping it in run() would lose them.
+    _running.add(task)
+    task.signals.done.connect(lambda: _running.discard(task))
+    if poll:
+        task.pool = poll_pool()
+    else:
+        task.pool = writer_pool() if write else reader_pool()
+    task.write = write
+    task.pool.start(task)
+    return task
+
+
+def make_task(func, args, on_finished=None, on_failed=None, on_progress=None):
+    task = DbTask(func, *args)
+    if on_finished is not None:
+        task.signals.finished.connect(on_finished)
+    if on_failed is not None:
+        task.signals.failed.connect(on_failed)
+    if on_progress is not None:
+        # Long-running functions take a progress callback as their last argument.
+        task.args += (task.report_progress,)
+        task.signals.progress.connect(on_progress)
+    return task
+
+
+def run_read(func, *args, on_finished=None, on_failed=None, on_progress=None):
+    return submit(make_task(func, args, on_finished, on_failed, on_progress))
+
+
+def run_write(func, *args, on_finished=None, on_failed=None, on_progress=None):
+    return submit(make_task(func, args, on_finished, on_failed, on_progress), write=True)
+
+
+def wait_for_all():
+    for pool in (_reader_pool, _writer_pool, _poll_pool):
+        if pool is not None:
+            pool.waitForDone()